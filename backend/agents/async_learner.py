@@ -0,0 +1,95 @@
+# agents/async_learner.py
+
+import copy
+import queue
+import threading
+
+
+def frozen_copy(module):
+    """Inference-only copy of a network for the acting side of a learner."""
+    clone = copy.deepcopy(module)
+    clone.eval()
+    for p in clone.parameters():
+        p.requires_grad_(False)
+    return clone
+
+
+class AsyncLearner:
+    """
+    Background learner thread for an RL agent. The simulation thread submits
+    experience and training requests without waiting; the agent's handler runs
+    gradient steps here and publishes new acting weights by swapping a single
+    attribute reference, which is atomic under the GIL.
+
+    `handler(kind, payload)` is called on the learner thread for every item.
+    "train" requests are coalesced: at most one is ever queued, and its payload
+    is the number of requests it stands for, so the handler can still take one
+    gradient step per request. Other kinds are bounded by `max_pending` and
+    dropped (and counted) beyond that.
+    """
+
+    def __init__(self, handler, name: str, max_pending: int = 32):
+        self._handler = handler
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._train_requests = 0
+        self._stopping = False
+        self.max_pending = max_pending
+        self.version = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+        self._thread = threading.Thread(target=self._run, name=f"learner-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, kind: str, payload=None) -> bool:
+        with self._lock:
+            pending = self._pending.get(kind, 0)
+            if kind == "train":
+                self._train_requests += 1
+                if pending:
+                    return True
+            elif pending >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending[kind] = pending + 1
+        self._queue.put((kind, payload))
+        return True
+
+    def published(self):
+        self.version += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                kind, payload = item
+                with self._lock:
+                    self._pending[kind] -= 1
+                    if kind == "train":
+                        payload, self._train_requests = self._train_requests, 0
+                if self._stopping:
+                    continue
+                try:
+                    self._handler(kind, payload)
+                except Exception as e:
+                    self.errors += 1
+                    self.last_error = repr(e)
+            finally:
+                self._queue.task_done()
+
+    def drain(self):
+        """Block until everything submitted so far has been processed."""
+        self._queue.join()
+
+    def close(self, wait: bool = True):
+        """Stop the thread; with wait=False queued work is discarded instead of processed."""
+        if wait:
+            self.drain()
+        else:
+            self._stopping = True
+        self._queue.put(None)
+        self._thread.join()
@@ -1,16 +1,63 @@
 # agents/base_agent.py
 from typing import Dict
 import random
-from utils.config import STARTING_CASH, INITIAL_HOLDINGS_PROB, INITIAL_HOLDINGS_MAX, INVENTORY_LIMIT, TRANSACTION_COST
+from core.market_config import MarketConfig
 
 class BaseAgent:
-    def __init__(self, name: str, starting_cash: float = STARTING_CASH):
+    # Extra inputs decide() takes besides the sector: any of "state", "day", "market".
+    # None means the engine infers them from the decide() signature.
+    DECIDE_INPUTS = None
+
+    def __init__(self, name: str, starting_cash: float = None, config: MarketConfig = None):
         self.name = name
-        self.cash = float(starting_cash)
-        self.holdings: Dict[str, int] = {}   
+        self.config = config if config is not None else MarketConfig.default()
+        self._portfolio = None
+        self._row = None
+        self._cash = float(starting_cash if starting_cash is not None else self.config.starting_cash)
+        self._holdings: Dict[str, int] = {}
         self.wealth_history = []
-        for sector in []:
-            pass
+
+    def bind_config(self, config: MarketConfig):
+        """
+        Trade under `config` (MarketEngine calls this on registration). An agent
+        that has not traded yet also takes its starting cash from it.
+        """
+        if config is self.config:
+            return
+        if not self.wealth_history and self.cash == self.config.starting_cash:
+            self.cash = config.starting_cash
+        self.config = config
+
+    def _bind_portfolio(self, store, row: int):
+        """Called by PortfolioStore: cash and holdings become views into its arrays."""
+        self._portfolio = store
+        self._row = row
+        self._holdings = store.holdings_view(row)
+
+    @property
+    def cash(self) -> float:
+        if self._portfolio is not None:
+            return float(self._portfolio.cash[self._row])
+        return self._cash
+
+    @cash.setter
+    def cash(self, value: float):
+        if self._portfolio is not None:
+            self._portfolio.cash[self._row] = value
+        else:
+            self._cash = float(value)
+
+    @property
+    def holdings(self):
+        return self._holdings
+
+    @holdings.setter
+    def holdings(self, value):
+        if self._portfolio is not None:
+            self._holdings.clear()
+            self._holdings.update(value)
+        else:
+            self._holdings = dict(value)
 
     def initialize_holdings(self, sector_names):
         self.wealth_history.clear() 
@@ -19,8 +66,8 @@ class BaseAgent:
                 self.holdings[s] = 0
             return
         for s in sector_names:
-            if random.random() < INITIAL_HOLDINGS_PROB:
-                qty = random.randint(1, INITIAL_HOLDINGS_MAX)
+            if random.random() < self.config.initial_holdings_prob:
+                qty = random.randint(1, self.config.initial_holdings_max)
                 self.holdings[s] = qty
             else:
                 self.holdings[s] = 0
@@ -28,17 +75,17 @@ class BaseAgent:
     def can_buy_max(self, price: float, order_qty_max: int, order_cash_fraction: float):
         afford_qty = int(self.cash // price)
         cap_by_cash_fraction = int(max(1, (self.cash * order_cash_fraction) // price))
-        qty = min(order_qty_max, afford_qty, cap_by_cash_fraction, INVENTORY_LIMIT)
+        qty = min(order_qty_max, afford_qty, cap_by_cash_fraction, self.config.inventory_limit)
         return max(0, qty)
 
     
     def buy(self, sector_name: str, price: float, qty: int):
-        cost_total = price * qty * (1 + TRANSACTION_COST)
+        cost_total = price * qty * (1 + self.config.transaction_cost)
         
         if qty <= 0: 
             return False
             
-        if self.cash >= cost_total and self.holdings.get(sector_name, 0) + qty <= INVENTORY_LIMIT:
+        if self.cash >= cost_total and self.holdings.get(sector_name, 0) + qty <= self.config.inventory_limit:
             
             self.cash -= cost_total
             self.holdings[sector_name] = self.holdings.get(sector_name, 0) + qty
@@ -50,10 +97,12 @@ class BaseAgent:
             return False
         if self.holdings.get(sector_name, 0) >= qty: 
             self.holdings[sector_name] -= qty
-            self.cash += price * qty * (1 - TRANSACTION_COST) 
+            self.cash += price * qty * (1 - self.config.transaction_cost) 
             return True
         return False
     def portfolio_value(self, market_prices: dict):
+        if self._portfolio is not None:
+            return self._portfolio.value_of(self._row, self._portfolio.price_vector(market_prices))
         holdings_val = sum(self.holdings.get(s, 0) * market_prices.get(s, 0.0) for s in self.holdings)
         return self.cash + holdings_val
 
@@ -1,7 +1,6 @@
 # agents/conservative_agent.py (INCREASED ACTIVITY)
 
 from agents.base_agent import BaseAgent
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION
 import numpy as np
 
 class ConservativeTrader(BaseAgent):
@@ -20,7 +19,7 @@ class ConservativeTrader(BaseAgent):
         if len(history) < self.LOOKBACK + 1:
             return ("HOLD", 0)
 
-        returns = np.diff(history[-(self.LOOKBACK + 1):]) / history[-(self.LOOKBACK + 1):-1] 
+        returns = history.returns(self.LOOKBACK)
         weights = np.arange(1, self.LOOKBACK + 1)
         weighted_signal = np.dot(returns, weights) / np.sum(weights) * 100 # Convert to %
         
@@ -34,11 +33,11 @@ class ConservativeTrader(BaseAgent):
         MAX_TRADE_FRACTION = 0.30 
         
         trade_fraction = max(0.1, min(MAX_TRADE_FRACTION, signal_strength * 0.15)) 
-        qty_raw = int(ORDER_QTY_MAX * trade_fraction)
+        qty_raw = int(self.config.order_qty_max * trade_fraction)
 
         
         if weighted_signal > threshold: 
-            exec_qty = self.can_buy_max(sector.price, qty_raw, ORDER_CASH_FRACTION)
+            exec_qty = self.can_buy_max(sector.price, qty_raw, self.config.order_cash_fraction)
             return ("BUY", exec_qty)
             
         elif weighted_signal < -threshold:
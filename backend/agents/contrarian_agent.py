@@ -1,9 +1,7 @@
 # agents/contrarian_agent.py (REFINED LOGIC)
 
 import random
-import numpy as np
 from agents.base_agent import BaseAgent
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION
 
 class ContrarianAgent(BaseAgent):
     """
@@ -21,14 +19,14 @@ class ContrarianAgent(BaseAgent):
 
         current_price = history[-1]
         
-        sma = np.mean(history[-self.MA_WINDOW:])
+        sma = history.sma(self.MA_WINDOW)
         
         deviation = (current_price - sma) / sma
 
         action = "HOLD"
         qty_fraction = min(self.MAX_TRADE_FRACTION, abs(deviation) / self.DEVIATION_THRESHOLD * 0.15) 
         
-        qty_raw = int(ORDER_QTY_MAX * qty_fraction)
+        qty_raw = int(self.config.order_qty_max * qty_fraction)
 
         if deviation < -self.DEVIATION_THRESHOLD:
             action = "BUY"
@@ -38,7 +36,7 @@ class ContrarianAgent(BaseAgent):
             return ("HOLD", 0)
 
         if action == "BUY":
-            trade_qty = self.can_buy_max(sector.price, qty_raw, ORDER_CASH_FRACTION)
+            trade_qty = self.can_buy_max(sector.price, qty_raw, self.config.order_cash_fraction)
             
         elif action == "SELL":
             held = self.holdings.get(sector.name, 0)
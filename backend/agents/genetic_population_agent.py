@@ -0,0 +1,105 @@
+# agents/genetic_population_agent.py
+
+import numpy as np
+from agents.base_agent import BaseAgent
+from core.portfolio_store import PortfolioStore, buy_caps
+
+GENOME_KEYS = (
+    "momentum_thresh", "reversion_thresh", "trade_qty",
+    "aggressiveness", "news_sensitivity", "herd_sensitivity",
+)
+IMPACT_MODES = (None, "mean", "sum")
+
+# Cap the engine applies to every BUY on top of the agent's own sizing.
+ENGINE_BUY_CASH_FRACTION = 0.10
+
+
+class GeneticPopulation(BaseAgent):
+    """
+    N GeneticTrader genomes traded side by side in one simulation. Parameters
+    are NumPy vectors, portfolios live in a private N x sectors PortfolioStore,
+    and each candidate follows exactly the GeneticTrader rule and the engine's
+    execution checks.
+
+    impact=None makes the population a price-taker. "mean" sends the average
+    candidate's orders to the market (one representative trader), "sum" sends
+    all of them. With a single genome and "sum" the market sees exactly what
+    a GeneticTrader would have done.
+    """
+
+    def __init__(self, name, genomes, impact=None, starting_cash=None):
+        super().__init__(name)
+        if impact not in IMPACT_MODES:
+            raise ValueError(f"impact must be one of {IMPACT_MODES}, got {impact!r}")
+        self.genomes = [dict(g) for g in genomes]
+        self.size = len(self.genomes)
+        self.params = {k: np.array([g[k] for g in self.genomes], dtype=np.float64) for k in GENOME_KEYS}
+        self.qty_raw = (self.params["trade_qty"] * self.params["aggressiveness"]).astype(np.int64)
+        self.impact = impact
+        self.starting_cash = None if starting_cash is None else float(starting_cash)
+        self.book = None
+        self.rows = None
+        self._engine_ref = None
+        self.worth_history = []
+
+    def attach_engine(self, engine):
+        self._engine_ref = engine
+        self.book = PortfolioStore([s.name for s in engine.sectors], capacity=self.size)
+        cash = self.starting_cash if self.starting_cash is not None else self.config.starting_cash
+        self.rows = self.book.allocate(self.size, cash=cash)
+
+    def decide(self, sector):
+        return ("HOLD", 0)
+
+    def execute_day(self, sectors, day):
+        """
+        Decide and settle every candidate against its own book, sector by
+        sector like the engine does. Returns a sectors x 2 array of
+        (bought, sold) quantities that reach the market, or None for price-takers.
+        """
+        book, p, cfg = self.book, self.params, self.config
+        cash, holdings = book.cash, book.holdings
+        flow = np.zeros((len(sectors), 2), dtype=np.int64)
+
+        for i, sector in enumerate(sectors):
+            hist = sector.history
+            if len(hist) < 2:
+                continue
+            price = sector.price
+            ret = (hist[-1] - hist[-2]) / max(1e-9, hist[-2])
+            news = getattr(sector, "last_news_pct", 0.0)
+            herd = self._engine_ref.order_flow.imbalance(sector.name) if self._engine_ref is not None else 0.0
+            signal = ret + p["news_sensitivity"] * news / 100.0 + p["herd_sensitivity"] * herd
+
+            buy_signal = signal > p["momentum_thresh"]
+            want = buy_caps(cash, price, self.qty_raw, cfg.order_cash_fraction, cfg.inventory_limit)
+            want = np.where(buy_signal, want, 0)
+            exec_qty = np.minimum(want, buy_caps(cash, price, want, ENGINE_BUY_CASH_FRACTION, cfg.inventory_limit))
+            cost = price * exec_qty * (1 + cfg.transaction_cost)
+            buys = (exec_qty > 0) & (cash >= cost)
+            filled = buys & (holdings[:, i] + exec_qty <= cfg.inventory_limit)
+            cash[filled] -= cost[filled]
+            holdings[filled, i] += exec_qty[filled]
+            flow[i, 0] = exec_qty[buys].sum()
+
+            sell_qty = np.where(~buy_signal & (signal < -p["reversion_thresh"]),
+                                np.minimum(self.qty_raw, holdings[:, i]), 0)
+            sells = sell_qty > 0
+            holdings[sells, i] -= sell_qty[sells]
+            cash[sells] += price * sell_qty[sells] * (1 - cfg.transaction_cost)
+            flow[i, 1] = sell_qty.sum()
+
+        if self.impact is None:
+            return None
+        if self.impact == "mean":
+            flow = np.rint(flow / self.size).astype(np.int64)
+        return flow
+
+    def on_day_end(self, day, prices):
+        self.worth_history.append(self.book.values(self.book.price_vector(prices)))
+
+    def worth_matrix(self):
+        """days x candidates mark-to-market values."""
+        if not self.worth_history:
+            return np.zeros((0, self.size))
+        return np.stack(self.worth_history)
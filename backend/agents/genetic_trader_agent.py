@@ -2,7 +2,6 @@
 
 import random
 from agents.base_agent import BaseAgent
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION 
 
 class GeneticTrader(BaseAgent):
     """A rule-based trader controlled by an evolved genome."""
@@ -38,19 +37,15 @@ class GeneticTrader(BaseAgent):
         news_signal = self.genome["news_sensitivity"] * news / 100.0
 
         herd_signal = 0.0
-        if self._engine_ref and hasattr(self._engine_ref, "herd_memory"):
-            mem = self._engine_ref.herd_memory.get(sector.name, {})
-            total = max(1, mem.get("buy", 0) + mem.get("sell", 0))
-            herd_signal = self.genome["herd_sensitivity"] * (
-                (mem.get("buy", 0) - mem.get("sell", 0)) / total
-            )
+        if self._engine_ref is not None:
+            herd_signal = self.genome["herd_sensitivity"] * self._engine_ref.order_flow.imbalance(sector.name)
 
         signal = ret + news_signal + herd_signal
         
         qty_raw = int(self.genome["trade_qty"] * self.genome["aggressiveness"])
         
         if signal > self.genome["momentum_thresh"]:
-            trade_qty = self.can_buy_max(sector.price, qty_raw, ORDER_CASH_FRACTION)
+            trade_qty = self.can_buy_max(sector.price, qty_raw, self.config.order_cash_fraction)
             if trade_qty > 0:
                 self.txn_count += 1
                 return ("BUY", trade_qty)
@@ -2,7 +2,6 @@
 
 from agents.base_agent import BaseAgent
 import random
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION 
 
 class Sector:
     history: list[float]
@@ -18,16 +17,24 @@ class HerdFollowerAgent(BaseAgent):
         self.herd_memory = herd_memory
         self.herd_strength = herd_strength
         self.last_direction = {} 
+        self.order_flow = None
+
+    def attach_engine(self, engine):
+        self.order_flow = engine.order_flow
 
     def decide(self, sector: Sector):
-        stats = self.herd_memory.get(sector.name, {"buy": 0, "sell": 0})
-        total = stats["buy"] + stats["sell"]
+        if self.order_flow is not None:
+            buys, sells = self.order_flow.last_counts(sector.name)
+        else:
+            stats = self.herd_memory.get(sector.name, {"buy": 0, "sell": 0})
+            buys, sells = stats["buy"], stats["sell"]
+        total = buys + sells
 
         if total == 0:
             return ("HOLD", 0)
 
-        buy_ratio = stats["buy"] / total
-        sell_ratio = stats["sell"] / total
+        buy_ratio = buys / total
+        sell_ratio = sells / total
 
         if random.random() < 0.05:
             return ("HOLD", 0)
@@ -39,10 +46,10 @@ class HerdFollowerAgent(BaseAgent):
 
         base_qty = int(self.herd_strength * bias_strength) + 1
         
-        qty_raw = min(base_qty, ORDER_QTY_MAX)
+        qty_raw = min(base_qty, self.config.order_qty_max)
 
         if buy_ratio > threshold:
-            exec_qty = self.can_buy_max(sector.price, qty_raw, ORDER_CASH_FRACTION)
+            exec_qty = self.can_buy_max(sector.price, qty_raw, self.config.order_cash_fraction)
             if exec_qty > 0:
                 self.last_direction[sector.name] = "BUY"
                 return ("BUY", exec_qty)
@@ -2,7 +2,6 @@
 
 from agents.base_agent import BaseAgent
 import random
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION 
 
 class LongTermInvestorAgent(BaseAgent):
     def __init__(self, name, base_values, window=5, rebalance_freq=2, adapt_rate=0.02):
@@ -38,7 +37,7 @@ class LongTermInvestorAgent(BaseAgent):
         qty_raw = int((abs(deviation) * 400) + random.randint(10, 30))
 
         if action == "BUY":
-            exec_qty = self.can_buy_max(sector.price, qty_raw, ORDER_CASH_FRACTION)
+            exec_qty = self.can_buy_max(sector.price, qty_raw, self.config.order_cash_fraction)
             if exec_qty > 0:
                 return ("BUY", exec_qty)
         
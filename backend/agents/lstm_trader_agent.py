@@ -1,6 +1,7 @@
 # agents/lstm_trader_agent.py (FINAL COMPLETE ROBUST CODE - NORMALIZATION REMOVED)
 
 import os
+from collections import deque
 import numpy as np
 import torch
 import torch.nn as nn
@@ -9,7 +10,6 @@ from typing import List, Optional
 
 
 from agents.base_agent import BaseAgent
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION
 
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
@@ -52,6 +52,74 @@ def compute_features(prices: List[float]):
     return features
 
 
+class StreamingFeatures:
+    """
+    Incremental version of compute_features for one price series. Each push()
+    emits the newest feature row in O(1), bit-identical to the corresponding
+    row of compute_features over the full prefix (same float32/float64 steps),
+    and only the last `window_size` rows are kept.
+    """
+
+    WINDOW_FEATURE = 5
+
+    def __init__(self, window_size: int):
+        self.window_size = window_size
+        self.rows = deque(maxlen=window_size)
+        self.n = 0
+        self._prices = deque(maxlen=self.WINDOW_FEATURE)
+        self._gains = deque(maxlen=self.WINDOW_FEATURE)
+        self._losses = deque(maxlen=self.WINDOW_FEATURE)
+        self._sma_kernel = np.ones(self.WINDOW_FEATURE) / self.WINDOW_FEATURE
+
+    def push(self, price: float) -> np.ndarray:
+        w = self.WINDOW_FEATURE
+        p = np.float32(price)
+        i = self.n
+        if i == 0:
+            ret = 0.0
+            delta = np.float32(0)
+        else:
+            prev = self._prices[-1]
+            delta = p - prev
+            ret = float(delta / (prev + 1e-9))
+        self._prices.append(p)
+        self._gains.append(delta if delta > 0 else np.float32(0))
+        self._losses.append(-delta if delta < 0 else np.float32(0))
+
+        window = np.array(self._prices, dtype=np.float32)
+        if i < w - 1:
+            sma = float(np.mean(window))
+        else:
+            sma = float(np.convolve(window, self._sma_kernel, mode="valid")[0])
+        sma_ratio = sma / float(p + 1e-9)
+
+        rsi_norm = np.float32(0)
+        if i >= w:
+            avg_gain = np.mean(np.array(self._gains, dtype=np.float32))
+            avg_loss = np.mean(np.array(self._losses, dtype=np.float32))
+            rs = avg_gain / avg_loss if avg_loss != 0 else np.float32(0)
+            rsi_norm = (100 - (100 / (1 + rs))) / 100.0
+
+        row = np.array([ret, sma_ratio, float(rsi_norm), ret], dtype=np.float64)
+        self.rows.append(row)
+        self.n = i + 1
+        return row
+
+    def sync(self, prices) -> "StreamingFeatures":
+        """Consume any prices appended since the last call; replay if history was rewritten."""
+        if self.n > len(prices) or (self.n and np.float32(prices[self.n - 1]) != self._prices[-1]):
+            self.__init__(self.window_size)
+        for t in range(self.n, len(prices)):
+            self.push(prices[t])
+        return self
+
+    def window(self) -> np.ndarray:
+        """compute_features(prices)[-window_size:] for the prices pushed so far."""
+        if self.n < self.WINDOW_FEATURE:
+            return np.zeros((min(self.n, self.window_size), 4), dtype=np.float32)
+        return np.stack(self.rows)
+
+
 
 class LSTMClassifier(nn.Module):
     def __init__(self, input_size=4, hidden_size=64, num_layers=1, dropout=0.2):
@@ -69,6 +137,20 @@ class LSTMClassifier(nn.Module):
         logits = self.fc(last)
         return logits
 
+
+_SHARED_MODELS = {}
+
+def shared_lstm_model(model_path: str, hidden_size: int, num_layers: int) -> LSTMClassifier:
+    """One eval-mode LSTMClassifier per weights file/shape, shared by every LSTMTrader using it."""
+    key = (os.path.abspath(model_path), hidden_size, num_layers)
+    model = _SHARED_MODELS.get(key)
+    if model is None:
+        model = LSTMClassifier(input_size=4, hidden_size=hidden_size, num_layers=num_layers).to(DEVICE)
+        model.load_state_dict(torch.load(model_path, map_location=DEVICE))
+        model.eval()
+        _SHARED_MODELS[key] = model
+    return model
+
 class LSTMTrader(BaseAgent):
     def __init__(
         self,
@@ -84,21 +166,52 @@ class LSTMTrader(BaseAgent):
         self.conf_threshold = conf_threshold
         self.qty_fraction = qty_fraction
 
-        self.model = LSTMClassifier(
-            input_size=4, hidden_size=hidden_size, num_layers=num_layers
-        ).to(DEVICE)
+        self.model = None
         model_path="models/lstm_cls_v2.pt"
         if model_path and os.path.exists(model_path):
             try:
-                self.load(model_path)
+                self.model = shared_lstm_model(model_path, hidden_size, num_layers)
                 print(f"LSTM Model loaded successfully from {model_path} for {name}.")
             except Exception as e:
                 print(f"ERROR loading LSTM model from {model_path} for {name}: {e}")
         else:
             print(f"LSTM Model file NOT FOUND at path: {model_path} for {name}.")
+        if self.model is None:
+            self.model = LSTMClassifier(
+                input_size=4, hidden_size=hidden_size, num_layers=num_layers
+            ).to(DEVICE)
 
         self.pred_history = []
         self.conf_history = []
+        self._feature_streams = {}
+        self._day_probs = {}
+
+    @classmethod
+    def prepare_day(cls, agents, sectors, day):
+        """
+        Engine day stage: gather every pending window of these agents across all
+        sectors and run one batched forward pass per distinct model. decide()
+        then picks the probabilities up instead of running its own batch-1 pass.
+        """
+        groups = {}
+        for agent in agents:
+            agent._day_probs.clear()
+            for sector in sectors:
+                feats = agent._stream_features(sector)
+                if feats is None:
+                    continue
+                key = (id(agent.model), agent.window_size)
+                _, entries, windows = groups.setdefault(key, (agent.model, [], []))
+                entries.append((agent, sector))
+                windows.append(feats)
+
+        with torch.inference_mode():
+            for model, entries, windows in groups.values():
+                model.eval()
+                batch = torch.tensor(np.stack(windows), dtype=torch.float32, device=DEVICE)
+                probs = torch.softmax(model(batch), dim=-1).cpu().numpy()
+                for (agent, sector), p in zip(entries, probs):
+                    agent._day_probs[sector.name] = (len(sector.history), p)
 
     def _prepare_window(self, prices: List[float]) -> Optional[torch.Tensor]:
         full_feats = compute_features(prices) 
@@ -111,19 +224,38 @@ class LSTMTrader(BaseAgent):
         
         x = torch.tensor(feats, dtype=torch.float32, device=DEVICE).unsqueeze(0)
         return x  
+
+    def _stream_features(self, sector) -> Optional[np.ndarray]:
+        """Same features as _prepare_window(sector.history), from per-sector streaming state."""
+        stream = self._feature_streams.get(sector.name)
+        if stream is None:
+            stream = self._feature_streams[sector.name] = StreamingFeatures(self.window_size)
+        stream.sync(sector.history)
+        if stream.n < self.window_size:
+            return None
+        return stream.window()
+
+    def _predict(self, sector) -> Optional[np.ndarray]:
+        cached = self._day_probs.pop(sector.name, None)
+        if cached is not None and cached[0] == len(sector.history):
+            return cached[1]
+        feats = self._stream_features(sector)
+        if feats is None:
+            return None
+        x = torch.tensor(feats, dtype=torch.float32, device=DEVICE).unsqueeze(0)
+        self.model.eval()
+        with torch.inference_mode():
+            logits = self.model(x)
+            return torch.softmax(logits, dim=-1).cpu().numpy().flatten()
     
     def decide(self, sector):
         prices = sector.history
-        x = self._prepare_window(prices)
-        if x is None:
+        probs = self._predict(sector)
+        if probs is None:
             return ("HOLD", 0)
 
-        self.model.eval()
-        with torch.no_grad():
-            logits = self.model(x)
-            probs = torch.softmax(logits, dim=-1).cpu().numpy().flatten()
-            pred_idx = np.argmax(probs)
-            conf = probs[pred_idx]
+        pred_idx = np.argmax(probs)
+        conf = probs[pred_idx]
 
         self.pred_history.append(pred_idx)
         self.conf_history.append(conf)
@@ -134,8 +266,7 @@ class LSTMTrader(BaseAgent):
         else:
             avg_pred = pred_idx
 
-        recent_prices = np.array(prices[-self.window_size:])
-        volatility = np.std(np.diff(np.log(recent_prices + 1e-9)))
+        volatility = sector.history.log_return_std(self.window_size - 1)
         dyn_thresh = min(0.8, self.conf_threshold + 0.2 * volatility) 
 
         if conf < dyn_thresh:
@@ -144,13 +275,13 @@ class LSTMTrader(BaseAgent):
         last_price = prices[-1]
         
         if avg_pred == 2:  
-            qty_raw = max(1, int(ORDER_QTY_MAX * self.qty_fraction))
-            exec_qty = self.can_buy_max(last_price, qty_raw, ORDER_CASH_FRACTION)
+            qty_raw = max(1, int(self.config.order_qty_max * self.qty_fraction))
+            exec_qty = self.can_buy_max(last_price, qty_raw, self.config.order_cash_fraction)
             return ("BUY", exec_qty)
 
         elif avg_pred == 0:  # down (index 0) → SELL
             held = self.holdings.get(sector.name, 0)
-            qty_raw = max(1, int(ORDER_QTY_MAX * self.qty_fraction))
+            qty_raw = max(1, int(self.config.order_qty_max * self.qty_fraction))
             qty_to_sell = min(held, qty_raw) 
             return ("SELL", qty_to_sell)
 
@@ -162,7 +293,12 @@ class LSTMTrader(BaseAgent):
         torch.save(self.model.state_dict(), path)
 
     def load(self, path: str):
-        self.model.load_state_dict(torch.load(path, map_location=DEVICE))
+        # Load into a private copy so agents sharing the default weights are unaffected.
+        model = LSTMClassifier(
+            input_size=4, hidden_size=self.model.lstm.hidden_size, num_layers=self.model.lstm.num_layers
+        ).to(DEVICE)
+        model.load_state_dict(torch.load(path, map_location=DEVICE))
+        self.model = model
 
 
 def build_training_data(prices, window=10):
@@ -3,7 +3,6 @@
 from agents.base_agent import BaseAgent
 import random
 import numpy as np
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION
 
 class MomentumAgent(BaseAgent):
     """
@@ -43,11 +42,11 @@ class MomentumAgent(BaseAgent):
                 action = "SELL"
             
         
-        trade_qty_limit = int(ORDER_QTY_MAX * trade_fraction)
+        trade_qty_limit = int(self.config.order_qty_max * trade_fraction)
         current_price = history[-1]
         
         if action == "BUY":
-            max_qty = self.can_buy_max(current_price, trade_qty_limit, ORDER_CASH_FRACTION)
+            max_qty = self.can_buy_max(current_price, trade_qty_limit, self.config.order_cash_fraction)
             qty = max_qty
             
         elif action == "SELL":
@@ -2,13 +2,14 @@
 
 from agents.base_agent import BaseAgent
 import random
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION 
 
 
 """This agent trades based exclusively on the net positive/negative score aggregated from 
 the LLM-generated news headlines for the current day, assuming an informational advantage."""
 
 class NewsFollowerAgent(BaseAgent):
+    DECIDE_INPUTS = ("day",)
+
     def __init__(self, name, news_feed):
         super().__init__(name)
         self.news_feed = news_feed
@@ -45,12 +46,12 @@ class NewsFollowerAgent(BaseAgent):
         max_fraction = 0.5
         score_base = max(1, abs(sentiment_score)) 
         
-        qty_raw = int(min(ORDER_QTY_MAX * max_fraction, score_base * 5 + random.randint(1, 10))) 
+        qty_raw = int(min(self.config.order_qty_max * max_fraction, score_base * 5 + random.randint(1, 10))) 
 
         current_price = sector.price
         
         if action == "BUY":
-            exec_qty = self.can_buy_max(current_price, qty_raw, ORDER_CASH_FRACTION)
+            exec_qty = self.can_buy_max(current_price, qty_raw, self.config.order_cash_fraction)
             if exec_qty > 0:
                 return ("BUY", exec_qty)
         
@@ -2,7 +2,6 @@
 
 from agents.base_agent import BaseAgent
 import random
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION 
 
 class PanicTrader(BaseAgent):
     """Emotionally reactive trader that sells on fear and buys from FOMO."""
@@ -14,7 +13,7 @@ class PanicTrader(BaseAgent):
         pct_change = (sector.history[-1] - sector.history[-2]) / sector.history[-2] * 100
         current_price = sector.history[-1]
         
-        max_commit_qty = int(ORDER_QTY_MAX) 
+        max_commit_qty = int(self.config.order_qty_max) 
         
         if pct_change < -2:
             held = self.holdings.get(sector.name, 0)
@@ -29,7 +28,7 @@ class PanicTrader(BaseAgent):
         elif pct_change > 2:
             fomo_qty_raw = int(max_commit_qty * random.uniform(0.3, 0.8))
             
-            buy_qty = self.can_buy_max(current_price, fomo_qty_raw, ORDER_CASH_FRACTION)
+            buy_qty = self.can_buy_max(current_price, fomo_qty_raw, self.config.order_cash_fraction)
             
             if buy_qty > 0:
                 return ("BUY", buy_qty)
@@ -38,7 +37,7 @@ class PanicTrader(BaseAgent):
             impulse_qty_raw = int(max_commit_qty * 0.5)
             
             if random.random() < 0.5: 
-                buy_qty = self.can_buy_max(current_price, impulse_qty_raw, ORDER_CASH_FRACTION)
+                buy_qty = self.can_buy_max(current_price, impulse_qty_raw, self.config.order_cash_fraction)
                 if buy_qty > 0:
                     return ("BUY", buy_qty)
             else:
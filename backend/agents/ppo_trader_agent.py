@@ -5,7 +5,8 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 from agents.base_agent import BaseAgent
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION, INVENTORY_LIMIT, STARTING_CASH 
+from agents.async_learner import AsyncLearner, frozen_copy
+from agents.rollout_buffer import RolloutBuffer, discounted_gae
 
 
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -28,46 +29,39 @@ class PolicyNetwork(nn.Module):
 
 
 class PPOTrader(BaseAgent):
-    def __init__(self, name="PPOTrader", lookback=3, qty_fraction=0.3): 
+    DECIDE_INPUTS = ("state",)
+
+    def __init__(self, name="PPOTrader", lookback=3, qty_fraction=0.3,
+                 rollout_days=64, n_epochs=4, minibatch_size=64, gae_lambda=0.95):
         super().__init__(name)
         self.lookback = lookback
         self.is_rl_agent = True
         self.qty_fraction = qty_fraction 
 
         self.gamma = 0.99
+        self.gae_lambda = gae_lambda
         self.clip_epsilon = 0.2
         self.lr = 3e-4
+        self.n_epochs = n_epochs
+        self.minibatch_size = minibatch_size
 
         self.policy = PolicyNetwork(input_dim=self.lookback + 2).to(DEVICE)
+        # Acting network; a frozen copy of `policy` while a background learner runs.
+        self.acting_policy = self.policy
+        self.learner = None
         self.optimizer = optim.Adam(self.policy.parameters(), lr=self.lr)
 
-        self.states = []
-        self.actions = []
-        self.rewards = []
-        self.log_probs = []
-        self.values = []
-        self.dones = []
+        self.buffer = RolloutBuffer(rollout_days, state_dim=self.lookback + 2, device=DEVICE)
+        # Last sector seen per buffer slot, for bootstrapping truncated rollouts.
+        self._sectors = {}
 
     def _build_state(self, sector):
-        hist = sector.history
-        returns = []
-        for i in range(self.lookback):
-            idx = -(i + 1)
-            if len(hist) + idx - 1 >= 0:
-                prev = hist[idx - 1]
-                cur = hist[idx]
-                if prev != 0:
-                    returns.append((cur - prev) / prev)
-                else:
-                    returns.append(0.0)
-            else:
-                returns.append(0.0)
-        returns = returns[::-1]
+        returns = sector.history.returns(self.lookback).tolist()
 
         held = self.holdings.get(sector.name, 0)
         
-        holdings_frac = held / max(1, INVENTORY_LIMIT) 
-        cash_ratio = self.cash / max(1.0, STARTING_CASH)
+        holdings_frac = held / max(1, self.config.inventory_limit) 
+        cash_ratio = self.cash / max(1.0, self.config.starting_cash)
 
         state = np.array(list(returns) + [holdings_frac, cash_ratio], dtype=np.float32)
         return state
@@ -77,27 +71,26 @@ class PPOTrader(BaseAgent):
             state = self._build_state(sector)
 
         state_tensor = torch.tensor(state, dtype=torch.float32, device=DEVICE).unsqueeze(0)
-        logits, value = self.policy(state_tensor)
-        probs = torch.softmax(logits, dim=-1)
-        dist = torch.distributions.Categorical(probs)
-        action = dist.sample()
-        logprob = dist.log_prob(action)
-
-        self.states.append(state)
-        self.actions.append(action.item())
-        self.log_probs.append(logprob)
-        self.values.append(value.squeeze().detach())
+        with torch.no_grad():
+            logits, value = self.acting_policy(state_tensor)
+            probs = torch.softmax(logits, dim=-1)
+            dist = torch.distributions.Categorical(probs)
+            action = dist.sample()
+            logprob = dist.log_prob(action)
 
         action_idx = action.item()
+        self._sectors[sector.name] = sector
+        self.buffer.add(sector.name, state, action_idx, logprob.item(), value.item())
+
         current_price = sector.price
         
-        qty_raw = int(ORDER_QTY_MAX * self.qty_fraction) 
+        qty_raw = int(self.config.order_qty_max * self.qty_fraction) 
         
         if action_idx == 0:
             return ("HOLD", 0)
             
         elif action_idx == 1:
-            buy_qty = self.can_buy_max(current_price, qty_raw, ORDER_CASH_FRACTION)
+            buy_qty = self.can_buy_max(current_price, qty_raw, self.config.order_cash_fraction)
             return ("BUY", buy_qty)
             
         else: 
@@ -106,68 +99,108 @@ class PPOTrader(BaseAgent):
             return ("SELL", sell_qty)
 
     def store_reward(self, reward, done=False):
-        self.rewards.append(reward)
-        self.dones.append(done)
+        if self.buffer.full:
+            self.update()
+        self.buffer.close_day(reward, done)
 
     def update(self):
-        if len(self.rewards) == 0:
+        if len(self.buffer) == 0:
             return
 
-        states = torch.tensor(np.stack(self.states), dtype=torch.float32, device=DEVICE)
-        actions = torch.tensor(self.actions, dtype=torch.long, device=DEVICE)
-        old_log_probs = torch.stack(self.log_probs).detach()
-        values = torch.stack(self.values).to(DEVICE)
-        rewards = torch.tensor(self.rewards, dtype=torch.float32, device=DEVICE)
-        dones = torch.tensor(self.dones, dtype=torch.float32, device=DEVICE)
-
-        returns = []
-        G = 0
-        for r, done in zip(reversed(rewards), reversed(dones)):
-            if done:
-                G = 0
-            G = r + self.gamma * G
-            returns.insert(0, G)
-        returns = torch.tensor(returns, dtype=torch.float32, device=DEVICE)
-
-        min_len = min(len(returns), len(values), len(actions), len(old_log_probs))
-        returns = returns[:min_len]
-        values = values[:min_len]
-        actions = actions[:min_len]
-        old_log_probs = old_log_probs[:min_len]
-        states = states[:min_len]
-
-        advantages = returns - values.detach()
-
-        logits, new_values = self.policy(states)
-        probs = torch.softmax(logits, dim=-1)
-        dist = torch.distributions.Categorical(probs)
-        new_log_probs = dist.log_prob(actions)
-        ratio = torch.exp(new_log_probs - old_log_probs)
-
-        # PPO clipped objective
-        surr1 = ratio * advantages
-        surr2 = torch.clamp(ratio, 1 - self.clip_epsilon, 1 + self.clip_epsilon) * advantages
-        actor_loss = -torch.min(surr1, surr2).mean()
-        critic_loss = (returns - new_values.squeeze()).pow(2).mean()
-
-        loss = actor_loss + 0.5 * critic_loss
-
-        self.optimizer.zero_grad()
-        loss.backward()
-        self.optimizer.step()
-
-        self.states.clear()
-        self.actions.clear()
-        self.rewards.clear()
-        self.log_probs.clear()
-        self.values.clear()
-        self.dones.clear()
+        rollout = self.buffer.closed(self._bootstrap_values())
+        if self.learner is not None:
+            rollout = tuple(t.clone() for t in rollout)
+            self.buffer.reset()
+            self.learner.submit("rollout", rollout)
+            return
 
-    def store_reward(self, reward, done=False):
-        self.rewards.append(reward)
-        self.dones.append(done)
+        self._optimize(rollout)
+        self.buffer.reset()
+
+    def _bootstrap_values(self):
+        """
+        Critic values of the state after the last rewarded day, per buffer slot.
+        Slots that already acted on the open day keep the value recorded then;
+        the rest (all of them when update() runs between days) are evaluated on
+        their sector's current state. Zero if the last day ended the episode.
+        """
+        buf = self.buffer
+        T = buf.t
+        values = torch.where(buf.mask[T], buf.values[T], torch.zeros_like(buf.values[T]))
+        if T == 0 or buf.dones[T - 1] > 0:
+            return values
+        missing = [(slot, self._sectors[key]) for key, slot in buf.slot_index.items()
+                   if key in self._sectors and not buf.mask[T, slot]]
+        if missing:
+            slots = [slot for slot, _ in missing]
+            states = np.stack([self._build_state(sector) for _, sector in missing])
+            with torch.no_grad():
+                _, value = self.acting_policy(torch.tensor(states, dtype=torch.float32, device=DEVICE))
+            values[slots] = value.squeeze(-1).to(values.dtype)
+        return values
+
+    def _optimize(self, rollout):
+        states, actions, old_log_probs, values, mask, rewards, dones, last_values = rollout
+        advantages, returns = discounted_gae(rewards, values, dones, self.gamma, self.gae_lambda,
+                                             last_value=last_values)
+
+        states = states[mask]
+        actions = actions[mask]
+        old_log_probs = old_log_probs[mask]
+        advantages = advantages[mask]
+        returns = returns[mask]
+        if len(advantages) > 1:
+            advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+
+        n = len(actions)
+        for _ in range(self.n_epochs):
+            perm = torch.randperm(n, device=DEVICE)
+            for start in range(0, n, self.minibatch_size):
+                idx = perm[start:start + self.minibatch_size]
+                logits, new_values = self.policy(states[idx])
+                dist = torch.distributions.Categorical(logits=logits)
+                new_log_probs = dist.log_prob(actions[idx])
+                ratio = torch.exp(new_log_probs - old_log_probs[idx])
+
+                # PPO clipped objective
+                surr1 = ratio * advantages[idx]
+                surr2 = torch.clamp(ratio, 1 - self.clip_epsilon, 1 + self.clip_epsilon) * advantages[idx]
+                actor_loss = -torch.min(surr1, surr2).mean()
+                critic_loss = (returns[idx] - new_values.squeeze(-1)).pow(2).mean()
+
+                loss = actor_loss + 0.5 * critic_loss
+
+                self.optimizer.zero_grad()
+                loss.backward()
+                self.optimizer.step()
+
+    # ----------------------------------------------------------- async learner
+
+    def start_learner(self, max_pending=4):
+        """
+        Run PPO epochs on a background thread. Closed rollouts are handed over
+        as copies; acting uses a frozen policy until the learner publishes.
+        """
+        if self.learner is None:
+            self.acting_policy = frozen_copy(self.policy)
+            self.learner = AsyncLearner(self._handle_learner, self.name, max_pending=max_pending)
+        return self.learner
+
+    def stop_learner(self, wait=True):
+        if self.learner is not None:
+            self.learner.close(wait=wait)
+            self.learner = None
+        self.acting_policy = self.policy
+
+    def _handle_learner(self, kind, payload):
+        if kind == "rollout":
+            self._optimize(payload)
+            self.acting_policy = frozen_copy(self.policy)
+            self.learner.published()
 
     def save(self, path):
+        if self.learner is not None:
+            self.learner.drain()
         torch.save({
             "qnet": self.policy.state_dict(),
             "optimizer": self.optimizer.state_dict(),
@@ -176,4 +209,6 @@ class PPOTrader(BaseAgent):
     def load(self, path):
         data = torch.load(path, map_location=DEVICE)
         self.policy.load_state_dict(data["qnet"])
-        self.optimizer.load_state_dict(data["optimizer"])
\ No newline at end of file
+        self.optimizer.load_state_dict(data["optimizer"])
+        if self.learner is not None:
+            self.acting_policy = frozen_copy(self.policy)
\ No newline at end of file
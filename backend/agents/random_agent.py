@@ -2,7 +2,6 @@
 
 from agents.base_agent import BaseAgent
 import random
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION, P_EXPLORE
 
 class RandomAgent(BaseAgent):
     """
@@ -21,7 +20,7 @@ class RandomAgent(BaseAgent):
             action = "HOLD"
 
         if action == "BUY":
-            max_qty = self.can_buy_max(current_price, ORDER_QTY_MAX, ORDER_CASH_FRACTION)  
+            max_qty = self.can_buy_max(current_price, self.config.order_qty_max, self.config.order_cash_fraction)  
             qty = random.randint(1, max(1, max_qty)) if max_qty > 0 else 0      
             return ("BUY", qty)
             
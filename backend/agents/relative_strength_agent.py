@@ -1,9 +1,7 @@
 # agents/relative_strength_agent.py
 
 from agents.base_agent import BaseAgent
-import numpy as np
 import random
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION
 
 class RelativeStrengthAgent(BaseAgent):
     """
@@ -19,10 +17,7 @@ class RelativeStrengthAgent(BaseAgent):
         if len(history) < self.LOOKBACK + 1:
             return ("HOLD", 0)
 
-        prices_window = history[-self.LOOKBACK - 1:]
-        returns = np.diff(prices_window) / prices_window[:-1]
-        
-        momentum = np.mean(returns)
+        momentum = history.mean_return(self.LOOKBACK)
         
         THRESHOLD_SIMPLE = 0.002 
         
@@ -35,11 +30,11 @@ class RelativeStrengthAgent(BaseAgent):
         else:
             return ("HOLD", 0)
 
-        qty_raw = int(ORDER_QTY_MAX * self.TRADE_FRACTION) 
+        qty_raw = int(self.config.order_qty_max * self.TRADE_FRACTION) 
 
         if action == "BUY":
             current_price = sector.price
-            exec_qty = self.can_buy_max(current_price, qty_raw, ORDER_CASH_FRACTION)
+            exec_qty = self.can_buy_max(current_price, qty_raw, self.config.order_cash_fraction)
             return ("BUY", exec_qty)
             
         elif action == "SELL":
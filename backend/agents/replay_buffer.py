@@ -0,0 +1,155 @@
+# agents/replay_buffer.py
+
+import numpy as np
+import torch
+
+
+class ReplayBuffer:
+    """
+    Ring-buffer experience replay over contiguous NumPy arrays. Sampling draws
+    indices in one call and gathers each field with fancy indexing.
+    """
+
+    def __init__(self, capacity: int, state_dim: int):
+        self.capacity = capacity
+        self.state_dim = state_dim
+        self.states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+        self.ptr = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done) -> int:
+        i = self.ptr
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = float(done)
+        self.ptr = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return i
+
+    def _gather(self, idx):
+        return (self.states[idx], self.actions[idx], self.rewards[idx],
+                self.next_states[idx], self.dones[idx])
+
+    def sample(self, batch_size: int):
+        """Returns (indices, (states, actions, rewards, next_states, dones), weights)."""
+        idx = np.random.randint(0, self.size, size=min(batch_size, self.size))
+        return idx, self._gather(idx), np.ones(len(idx), dtype=np.float32)
+
+    def update_priorities(self, idx, td_errors):
+        pass
+
+    def state_dict(self):
+        n = self.size
+        return {
+            "capacity": self.capacity,
+            "ptr": self.ptr,
+            "size": n,
+            "states": torch.from_numpy(self.states[:n].copy()),
+            "actions": torch.from_numpy(self.actions[:n].copy()),
+            "rewards": torch.from_numpy(self.rewards[:n].copy()),
+            "next_states": torch.from_numpy(self.next_states[:n].copy()),
+            "dones": torch.from_numpy(self.dones[:n].copy()),
+        }
+
+    def load_state_dict(self, data):
+        n = min(int(data["size"]), self.capacity)
+        for name in ("states", "actions", "rewards", "next_states", "dones"):
+            getattr(self, name)[:n] = data[name][:n].numpy()
+        self.size = n
+        self.ptr = int(data["ptr"]) % self.capacity if n == self.capacity else n
+
+
+class SumTree:
+    """Binary sum tree over leaf priorities; prefix-sum lookups are vectorised over a batch."""
+
+    def __init__(self, capacity: int):
+        size = 1
+        while size < capacity:
+            size *= 2
+        self.leaves = size
+        self.tree = np.zeros(2 * size, dtype=np.float64)
+
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def update(self, idx, priorities):
+        idx = np.atleast_1d(np.asarray(idx)) + self.leaves
+        self.tree[idx] = priorities
+        idx = np.unique(idx // 2)
+        while len(idx) and idx[0] >= 1:
+            self.tree[idx] = self.tree[2 * idx] + self.tree[2 * idx + 1]
+            idx = np.unique(idx // 2)
+            idx = idx[idx >= 1]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Leaf index for each prefix-sum value."""
+        node = np.ones(len(values), dtype=np.int64)
+        values = values.astype(np.float64).copy()
+        while node[0] < self.leaves:
+            left = 2 * node
+            left_sum = self.tree[left]
+            go_right = values > left_sum
+            values = np.where(go_right, values - left_sum, values)
+            node = np.where(go_right, left + 1, left)
+        return node - self.leaves
+
+    def leaf_priorities(self, n: int) -> np.ndarray:
+        return self.tree[self.leaves:self.leaves + n]
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """Proportional prioritised replay (Schaul et al.) backed by a SumTree."""
+
+    def __init__(self, capacity: int, state_dim: int, alpha: float = 0.6, beta: float = 0.4, eps: float = 1e-3):
+        super().__init__(capacity, state_dim)
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def add(self, state, action, reward, next_state, done) -> int:
+        i = super().add(state, action, reward, next_state, done)
+        self.tree.update(i, self.max_priority ** self.alpha)
+        return i
+
+    def sample(self, batch_size: int):
+        k = min(batch_size, self.size)
+        total = self.tree.total()
+        # Stratified draws: one uniform value per equal slice of the priority mass.
+        bounds = np.linspace(0.0, total, k + 1)
+        values = np.random.uniform(bounds[:-1], bounds[1:])
+        idx = np.minimum(self.tree.find(values), self.size - 1)
+
+        probs = self.tree.tree[idx + self.tree.leaves] / max(total, 1e-12)
+        weights = (self.size * np.maximum(probs, 1e-12)) ** (-self.beta)
+        weights = (weights / weights.max()).astype(np.float32)
+        return idx, self._gather(idx), weights
+
+    def update_priorities(self, idx, td_errors):
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64)) + self.eps
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(idx, priorities ** self.alpha)
+
+    def state_dict(self):
+        data = super().state_dict()
+        data["priorities"] = torch.from_numpy(self.tree.leaf_priorities(self.size).copy())
+        data["max_priority"] = self.max_priority
+        return data
+
+    def load_state_dict(self, data):
+        super().load_state_dict(data)
+        if "priorities" in data:
+            self.tree.update(np.arange(self.size), data["priorities"][:self.size].numpy())
+            self.max_priority = float(data.get("max_priority", self.max_priority))
+        else:
+            self.tree.update(np.arange(self.size), np.full(self.size, self.max_priority ** self.alpha))
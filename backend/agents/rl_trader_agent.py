@@ -1,14 +1,15 @@
 # agents/rl_trader_agent.py (FINAL COMPLETE ROBUST CODE)
 
 import random
-from collections import deque
 import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
 
 from agents.base_agent import BaseAgent
-from utils.config import STARTING_CASH, ORDER_QTY_MAX, ORDER_CASH_FRACTION, INVENTORY_LIMIT, P_EXPLORE
+from agents.async_learner import AsyncLearner, frozen_copy
+from core.portfolio_store import buy_caps
+from agents.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
 
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
@@ -28,6 +29,8 @@ class QNet(nn.Module):
 
 
 class RLTrader(BaseAgent):
+    DECIDE_INPUTS = ("state",)
+
     def __init__(
         self,
         name,
@@ -38,7 +41,8 @@ class RLTrader(BaseAgent):
         batch_size=64,
         train_every=5,
         start_train_after=200,
-        qty_fraction=0.3 
+        qty_fraction=0.3,
+        prioritized_replay=False,
     ):
         super().__init__(name)
         self.lookback = lookback
@@ -53,36 +57,46 @@ class RLTrader(BaseAgent):
         self.epsilon_min = 0.05
         self.epsilon_decay = 0.995
         self.qnet = QNet(self.state_size).to(DEVICE)
+        # Network used for acting. Same object as qnet unless a background
+        # learner is running, in which case it is a frozen copy swapped on publish.
+        self.acting_qnet = self.qnet
+        self.learner = None
         self.target_q = QNet(self.state_size).to(DEVICE)
         self.target_q.load_state_dict(self.qnet.state_dict())
         self.optimizer = optim.Adam(self.qnet.parameters(), lr=lr)
-        self.loss_fn = nn.MSELoss()
-        self.memory = deque(maxlen=buffer_size)
+        self.loss_fn = nn.MSELoss(reduction="none")
+        if prioritized_replay:
+            self.memory = PrioritizedReplayBuffer(buffer_size, self.state_size)
+        else:
+            self.memory = ReplayBuffer(buffer_size, self.state_size)
         self._pending = {}
         self.is_rl_agent = True
         self._steps = 0
         self._last_portfolio = None
+        # Cash at the start of the engine's turn (set by prepare_day, cleared on day end).
+        self._turn_cash = None
+
+    @classmethod
+    def prepare_day(cls, agents, sectors, day):
+        """
+        Engine day stage: freeze each agent's cash for the turn. States and buy
+        caps then see the same cash whether decisions come from decide_all or
+        one decide() per sector interleaved with fills, so the replay buffer
+        only holds states the agent actually acted on.
+        """
+        for agent in agents:
+            agent._turn_cash = agent.cash
+
+    def _decision_cash(self):
+        return self.cash if self._turn_cash is None else self._turn_cash
 
 
     def _build_state(self, sector):
-        hist = sector.history
-        returns = []
-        for i in range(self.lookback):
-            idx = -(i+1)
-            if len(hist) + idx - 1 >= 0:
-                prev = hist[idx-1]
-                cur = hist[idx]
-                if prev != 0:
-                    returns.append((cur - prev) / prev)
-                else:
-                    returns.append(0.0)
-            else:
-                returns.append(0.0)
-        returns = returns[::-1]
-        
+        returns = sector.history.returns(self.lookback).tolist()
+
         held = self.holdings.get(sector.name, 0)
-        holdings_frac = held / max(1, INVENTORY_LIMIT)
-        cash_ratio = self.cash / max(1.0, STARTING_CASH)
+        holdings_frac = held / max(1, self.config.inventory_limit)
+        cash_ratio = self._decision_cash() / max(1.0, self.config.starting_cash)
 
         arr = np.array(returns + [holdings_frac, cash_ratio], dtype=np.float32)
         return arr
@@ -91,8 +105,9 @@ class RLTrader(BaseAgent):
         if action_idx == 0:
             return ("HOLD", 0)
         elif action_idx == 1:
-            qty_raw = int(ORDER_QTY_MAX * self.qty_fraction)
-            max_qty = self.can_buy_max(sector.price, qty_raw, ORDER_CASH_FRACTION)
+            qty_raw = int(self.config.order_qty_max * self.qty_fraction)
+            max_qty = int(buy_caps(self._decision_cash(), sector.price, qty_raw,
+                                   self.config.order_cash_fraction, self.config.inventory_limit))
             
             if max_qty <= 0:
                 return ("HOLD", 0)
@@ -104,40 +119,69 @@ class RLTrader(BaseAgent):
             if held <= 0:
                 return ("HOLD", 0)
                 
-            qty_raw = int(ORDER_QTY_MAX * self.qty_fraction) 
+            qty_raw = int(self.config.order_qty_max * self.qty_fraction) 
             qty = max(1, min(held, qty_raw))
             return ("SELL", qty)
 
     
-    def decide(self, sector,day=None):
-        
-        state = self._build_state(sector)
-        if random.random() < self.epsilon or random.random() < P_EXPLORE:
+    def decide(self, sector, state=None):
+        if state is None:
+            state = self._build_state(sector)
+        if random.random() < self.epsilon or random.random() < self.config.p_explore:
             action_idx = random.randrange(self.action_size)
         else:
             with torch.no_grad():
                 s = torch.tensor(state, dtype=torch.float32, device=DEVICE).unsqueeze(0)
-                q = self.qnet(s).cpu().numpy()[0]
+                q = self.acting_qnet(s).cpu().numpy()[0]
                 action_idx = int(np.argmax(q))
         self._pending[sector.name] = (state, action_idx)
         return self._map_action_to_trade(action_idx, sector)
 
+    def decide_all(self, sectors, day=None):
+        """
+        Act on every sector at once: one sectors x state_size matrix, vectorised
+        epsilon-greedy draws and a single Q-network forward pass.
+        """
+        states = np.stack([self._build_state(sector) for sector in sectors])
+        n = len(sectors)
+        explore = (np.random.random(n) < self.epsilon) | (np.random.random(n) < self.config.p_explore)
+        actions = np.random.randint(self.action_size, size=n)
+        if not explore.all():
+            with torch.inference_mode():
+                q = self.acting_qnet(torch.as_tensor(states, dtype=torch.float32, device=DEVICE))
+                greedy = q.argmax(dim=1).cpu().numpy()
+            actions = np.where(explore, actions, greedy)
+
+        decisions = []
+        for sector, state, action_idx in zip(sectors, states, actions):
+            action_idx = int(action_idx)
+            self._pending[sector.name] = (state, action_idx)
+            decisions.append(self._map_action_to_trade(action_idx, sector))
+        return decisions
+
     def on_day_end(self, day, prices):
-        
+        self._turn_cash = None
         cur_val = self.portfolio_value(prices)
         if self._last_portfolio is None:
             reward = 0.0
         else:
             reward = cur_val - self._last_portfolio
 
+        transitions = []
         for sector_name, (state, action_idx) in list(self._pending.items()):
             held = self.holdings.get(sector_name, 0)
-            holdings_frac = held / max(1, INVENTORY_LIMIT)
-            cash_ratio = self.cash / max(1.0, STARTING_CASH)
+            holdings_frac = held / max(1, self.config.inventory_limit)
+            cash_ratio = self.cash / max(1.0, self.config.starting_cash)
             next_state = np.array(list(state[:self.lookback]) + [holdings_frac, cash_ratio], dtype=np.float32)
 
             done = False 
-            self.memory.append((state, action_idx, float(reward), next_state, done))
+            transitions.append((state, action_idx, float(reward), next_state, done))
+
+        if self.learner is not None:
+            self.learner.submit("experience", transitions)
+        else:
+            for t in transitions:
+                self.memory.add(*t)
 
         self._pending.clear()
         self._last_portfolio = cur_val
@@ -145,18 +189,54 @@ class RLTrader(BaseAgent):
 
 
     def update(self):
+        if self.learner is not None:
+            self.learner.submit("train")
+            return
+        self._learn()
+
+    def _learn(self):
         if len(self.memory) >= self.start_train_after:
             self._train_step()
             if self._steps % (self.train_every * 10) == 0:
                 self.target_q.load_state_dict(self.qnet.state_dict())
+            return True
+        return False
+
+    # ----------------------------------------------------------- async learner
+
+    def start_learner(self):
+        """
+        Move replay writes and gradient steps onto a background thread. Acting
+        keeps using a frozen copy of the Q-network until the learner publishes.
+        """
+        if self.learner is None:
+            self.acting_qnet = frozen_copy(self.qnet)
+            self.learner = AsyncLearner(self._handle_learner, self.name, max_pending=1024)
+        return self.learner
+
+    def stop_learner(self, wait=True):
+        if self.learner is not None:
+            self.learner.close(wait=wait)
+            self.learner = None
+        self.acting_qnet = self.qnet
+
+    def _handle_learner(self, kind, payload):
+        if kind == "experience":
+            for t in payload:
+                self.memory.add(*t)
+        elif kind == "train":
+            # One step per coalesced request, as synchronous training would have taken.
+            trained = [self._learn() for _ in range(payload or 1)]
+            if any(trained):
+                self.acting_qnet = frozen_copy(self.qnet)
+                self.learner.published()
 
     def _train_step(self):
-        batch = random.sample(self.memory, min(self.batch_size, len(self.memory)))
-        states = torch.tensor(np.stack([b[0] for b in batch]), dtype=torch.float32, device=DEVICE)
-        actions = torch.tensor([b[1] for b in batch], dtype=torch.long, device=DEVICE)
-        rewards = torch.tensor([b[2] for b in batch], dtype=torch.float32, device=DEVICE)
-        next_states = torch.tensor(np.stack([b[3] for b in batch]), dtype=torch.float32, device=DEVICE)
-        dones = torch.tensor([b[4] for b in batch], dtype=torch.float32, device=DEVICE)
+        idx, batch, weights = self.memory.sample(self.batch_size)
+        states, actions, rewards, next_states, dones = (
+            torch.as_tensor(arr, device=DEVICE) for arr in batch
+        )
+        weights = torch.as_tensor(weights, device=DEVICE)
 
         q_values = self.qnet(states)
         q_sa = q_values.gather(1, actions.unsqueeze(1)).squeeze(1)
@@ -166,22 +246,32 @@ class RLTrader(BaseAgent):
             max_q_next, _ = q_next.max(dim=1)
             target = rewards + (1.0 - dones) * self.gamma * max_q_next
 
-        loss = self.loss_fn(q_sa, target)
+        loss = (weights * self.loss_fn(q_sa, target)).mean()
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
+        self.memory.update_priorities(idx, (target - q_sa).detach().cpu().numpy())
 
-    def save(self, path):
-        torch.save({
+    def save(self, path, include_replay=True):
+        if self.learner is not None:
+            self.learner.drain()
+        data = {
             "qnet": self.qnet.state_dict(),
             "target_q": self.target_q.state_dict(),
             "optimizer": self.optimizer.state_dict(),
             "epsilon": self.epsilon
-        }, path)
+        }
+        if include_replay:
+            data["replay"] = self.memory.state_dict()
+        torch.save(data, path)
 
     def load(self, path):
         data = torch.load(path, map_location=DEVICE)
         self.qnet.load_state_dict(data["qnet"])
         self.target_q.load_state_dict(data["target_q"])
         self.optimizer.load_state_dict(data["optimizer"])
-        self.epsilon = data.get("epsilon", self.epsilon)
\ No newline at end of file
+        self.epsilon = data.get("epsilon", self.epsilon)
+        if "replay" in data:
+            self.memory.load_state_dict(data["replay"])
+        if self.learner is not None:
+            self.acting_qnet = frozen_copy(self.qnet)
\ No newline at end of file
@@ -0,0 +1,125 @@
+# agents/rollout_buffer.py
+
+import torch
+
+
+def discounted_gae(rewards, values, dones, gamma, lam, last_value=None):
+    """
+    Generalised advantage estimation, vectorised over slots.
+
+    rewards, dones: (T,) per-day tensors (shared by every slot); values: (T, S).
+    `last_value` (S,) is the critic's value of the state after the last day,
+    used to bootstrap a rollout cut off by a full buffer rather than a `done`;
+    zeros if omitted.
+
+    A_t = sum over k in t..end(t) of c ** (k - t) * delta_k, with c = gamma * lam
+    and end(t) the first `done` at or after t, is evaluated as a reversed
+    cumulative sum of c ** k * delta_k, cut at end(t) and rescaled by c ** -t:
+    O(T * S) with no Python loop. Done in float64, where c ** -t stays finite
+    for rollouts up to ~10k days (rollout_days is 64 by default).
+    Returns (advantages, returns), both (T, S).
+    """
+    T = values.shape[0]
+    if last_value is None:
+        last_value = torch.zeros_like(values[0])
+    not_done = (1.0 - dones).unsqueeze(1)
+    next_values = torch.cat([values[1:], last_value.unsqueeze(0)], dim=0)
+    deltas = rewards.unsqueeze(1) + gamma * next_values * not_done - values
+
+    steps = torch.arange(T, device=values.device)
+    powers = (gamma * lam) ** steps.to(torch.float64)
+    scaled = deltas.to(torch.float64) * powers.unsqueeze(1)
+    # tail[t] = sum_{k >= t} scaled[k]; tail[T] = 0.
+    tail = torch.cat([scaled.flip(0).cumsum(0).flip(0), torch.zeros_like(scaled[:1])], dim=0)
+    # end[t]: first done at or after t (T - 1 if none), as a reversed running minimum.
+    done_at = torch.where(dones > 0, steps, torch.full_like(steps, T - 1))
+    end = done_at.flip(0).cummin(0).values.flip(0)
+    advantages = ((tail[:T] - tail[end + 1]) / powers.unsqueeze(1)).to(values.dtype)
+    return advantages, advantages + values
+
+
+class RolloutBuffer:
+    """
+    Preallocated on-policy storage laid out as days x slots (one slot per
+    sector). Log-probs and values are stored detached, so no autograd graph
+    outlives the step that produced it.
+    """
+
+    def __init__(self, capacity_days: int, state_dim: int, n_slots: int = 8, device="cpu"):
+        self.capacity = capacity_days
+        self.state_dim = state_dim
+        self.device = device
+        self.slot_index = {}
+        self._allocate(n_slots)
+        self.t = 0
+
+    def _allocate(self, n_slots):
+        D, dev = self.capacity, self.device
+        self.n_slots = n_slots
+        self.states = torch.zeros(D + 1, n_slots, self.state_dim, device=dev)
+        self.actions = torch.zeros(D + 1, n_slots, dtype=torch.long, device=dev)
+        self.log_probs = torch.zeros(D + 1, n_slots, device=dev)
+        self.values = torch.zeros(D + 1, n_slots, device=dev)
+        self.mask = torch.zeros(D + 1, n_slots, dtype=torch.bool, device=dev)
+        self.rewards = torch.zeros(D + 1, device=dev)
+        self.dones = torch.zeros(D + 1, device=dev)
+
+    def _slot(self, key):
+        slot = self.slot_index.get(key)
+        if slot is None:
+            slot = self.slot_index[key] = len(self.slot_index)
+            if slot >= self.n_slots:
+                old = (self.states, self.actions, self.log_probs, self.values, self.mask)
+                self._allocate(2 * self.n_slots)
+                for new, prev in zip((self.states, self.actions, self.log_probs, self.values, self.mask), old):
+                    new[:, :prev.shape[1]] = prev
+        return slot
+
+    @property
+    def full(self):
+        return self.t >= self.capacity
+
+    def __len__(self):
+        return self.t
+
+    def add(self, key, state, action, log_prob, value):
+        """Record one step for slot `key` in the current (not yet rewarded) day."""
+        slot = self._slot(key)
+        t = self.t
+        self.states[t, slot] = torch.as_tensor(state, dtype=torch.float32, device=self.device)
+        self.actions[t, slot] = action
+        self.log_probs[t, slot] = log_prob
+        self.values[t, slot] = value
+        self.mask[t, slot] = True
+
+    def close_day(self, reward, done=False):
+        """Attach the day's reward to every step taken that day and open the next row."""
+        t = self.t
+        if t >= self.capacity:
+            return
+        self.rewards[t] = float(reward)
+        self.dones[t] = float(done)
+        self.t = t + 1
+
+    def closed(self, last_values=None):
+        """
+        Tensors for the rewarded days only: states, actions, log_probs, values,
+        mask, rewards, dones, plus last_values: the critic's values of the
+        state after the last rewarded day, which bootstrap a truncated rollout.
+        Defaults to the open day's recorded values (zero for slots without a step).
+        """
+        T = self.t
+        if last_values is None:
+            last_values = torch.where(self.mask[T], self.values[T], torch.zeros_like(self.values[T]))
+        return (self.states[:T], self.actions[:T], self.log_probs[:T], self.values[:T],
+                self.mask[:T], self.rewards[:T], self.dones[:T], last_values)
+
+    def reset(self):
+        """Drop the rewarded days; steps already recorded for the open day move to row 0."""
+        T = self.t
+        for buf in (self.states, self.actions, self.log_probs, self.values, self.mask):
+            buf[0] = buf[T]
+            buf[1:] = 0
+        self.rewards.zero_()
+        self.dones.zero_()
+        self.t = 0
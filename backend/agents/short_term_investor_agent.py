@@ -2,8 +2,6 @@
 
 from agents.base_agent import BaseAgent
 import random
-import numpy as np
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION # CRITICAL IMPORTS
 
 class ShortTermInvestorAgent(BaseAgent):
     """High-frequency trader that capitalizes on short-term, risk-adjusted momentum."""
@@ -18,11 +16,8 @@ class ShortTermInvestorAgent(BaseAgent):
         if len(history) < self.lookback + 1:
             return ("HOLD", 0)
 
-        prices_window = history[-self.lookback - 1:]
-        returns = np.diff(prices_window) / prices_window[:-1]
-        
-        momentum = np.mean(returns)
-        volatility = np.std(returns) + 1e-6 
+        momentum = history.mean_return(self.lookback)
+        volatility = history.return_std(self.lookback) + 1e-6 
         signal_strength = momentum / volatility
         
         action = "HOLD"
@@ -39,12 +34,12 @@ class ShortTermInvestorAgent(BaseAgent):
         
         qty_raw = int(30 * abs(signal_strength)) + random.randint(1, 5)
         
-        qty_requested = min(qty_raw, ORDER_QTY_MAX)
+        qty_requested = min(qty_raw, self.config.order_qty_max)
 
         current_price = sector.price
         
         if action == "BUY":
-            exec_qty = self.can_buy_max(current_price, qty_requested, ORDER_CASH_FRACTION)
+            exec_qty = self.can_buy_max(current_price, qty_requested, self.config.order_cash_fraction)
             if exec_qty > 0:
                 return ("BUY", exec_qty)
             
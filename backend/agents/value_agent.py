@@ -1,7 +1,6 @@
 # agents/value_agent.py (FINAL ROBUST LOGIC & STRATEGIC ADJUSTMENT)
 
 from agents.base_agent import BaseAgent
-from utils.config import ORDER_QTY_MAX, ORDER_CASH_FRACTION
 
 class ValueAgent(BaseAgent):
     """
@@ -34,10 +33,10 @@ class ValueAgent(BaseAgent):
             action = "SELL"
             trade_fraction = min(self.MAX_TRADE_FRACTION, abs(mispricing_ratio) / self.MIN_DEVIATION * 0.1)
 
-        qty_raw = int(ORDER_QTY_MAX * trade_fraction)
+        qty_raw = int(self.config.order_qty_max * trade_fraction)
         
         if action == "BUY":
-            exec_qty = self.can_buy_max(current_price, qty_raw, ORDER_CASH_FRACTION)
+            exec_qty = self.can_buy_max(current_price, qty_raw, self.config.order_cash_fraction)
             if exec_qty > 0:
                 return ("BUY", exec_qty)
             
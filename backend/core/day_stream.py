@@ -0,0 +1,117 @@
+# core/day_stream.py
+
+import json
+import os
+import numpy as np
+
+SNAPSHOT_FIELDS = ("TotalValue", "Cash")
+
+
+def _encode(record) -> bytes:
+    return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _compact(value):
+    """Holdings stay integers; cash and values are rounded to cents."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return round(float(value), 2)
+
+
+class DayStreamWriter:
+    """
+    Append-only per-day results feed for one run, one compact JSON record per
+    line. A "header" names the sectors, agents and snapshot columns once; each
+    "day" then carries positional prices, that day's fills as id-encoded
+    columns, and only the agent snapshot rows ([agent index, *columns]) that
+    changed since the previous day. Readers tail the file, so a slow client never holds up the simulation.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "wb")
+        self._tx_offset = 0
+        self._snap_offset = 0
+        self._columns = None
+        self._last_rows = {}
+        self._agent_index = {}
+        self._known_traders = 0
+
+    def _write(self, record):
+        self._file.write(_encode(record))
+        self._file.flush()
+
+    def start(self, engine):
+        sector_names = [s.name for s in engine.sectors]
+        self._columns = list(SNAPSHOT_FIELDS) + sector_names
+        self._tx_offset = len(engine.transaction_log)
+        self._snap_offset = len(engine.agent_snapshots)
+        self._agent_index = {a.name: i for i, a in enumerate(engine.agents)}
+        self._write({
+            "type": "header",
+            "day": engine.day,
+            "sectors": sector_names,
+            "agents": [a.name for a in engine.agents],
+            "snapshot_columns": self._columns,
+            "prices": [s.price for s in engine.sectors],
+        })
+
+    def write_day(self, engine, day: int):
+        log = engine.transaction_log
+        tx = log.columns_between(self._tx_offset)
+        self._tx_offset = len(log)
+        new_traders = log.agent_names[self._known_traders:]
+        self._known_traders = len(log.agent_names)
+
+        changed = []
+        new_rows = engine.agent_snapshots[self._snap_offset:]
+        self._snap_offset = len(engine.agent_snapshots)
+        for entry in new_rows:
+            row = [_compact(entry.get(col, 0)) for col in self._columns]
+            if self._last_rows.get(entry["Agent"]) != row:
+                self._last_rows[entry["Agent"]] = row
+                changed.append([self._agent_index.get(entry["Agent"], entry["Agent"])] + row)
+
+        self._write({
+            "type": "day",
+            "day": day,
+            "prices": [s.price for s in engine.sectors],
+            "tx": {
+                # Agent ids index the log's name table; names are sent once, on first fill.
+                "new_traders": new_traders,
+                "agent": tx["agent"].tolist(),
+                "sector": tx["sector"].tolist(),
+                "side": tx["side"].tolist(),
+                "price": tx["price"].tolist(),
+                "qty": tx["qty"].tolist(),
+            },
+            "snapshots": changed,
+        })
+
+    def close(self, status: str = None):
+        if self._file.closed:
+            return
+        self._write({"type": "end", "status": status})
+        self._file.close()
+
+
+def read_records(path: str, offset: int = 0):
+    """
+    Complete records appended to a day stream since byte `offset`.
+    Returns ([(end_offset, line), ...], new_offset); a half-written last line is left for next time.
+    """
+    if not os.path.exists(path):
+        return [], offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    records = []
+    pos = 0
+    while True:
+        end = data.find(b"\n", pos)
+        if end < 0:
+            break
+        records.append((offset + end + 1, data[pos:end].decode("utf-8")))
+        pos = end + 1
+    return records, offset + pos
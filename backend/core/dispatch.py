@@ -0,0 +1,79 @@
+# core/dispatch.py
+
+import inspect
+
+DECIDE_INPUTS = ("state", "day", "market")
+
+
+def infer_decide_inputs(agent):
+    """Work out DECIDE_INPUTS from the decide() signature for agents that don't declare it."""
+    try:
+        params = list(inspect.signature(agent.decide).parameters.values())[1:]
+    except (TypeError, ValueError):
+        return ()
+    names = {p.name for p in params}
+    inputs = []
+    if "state" in names and hasattr(agent, "_build_state"):
+        inputs.append("state")
+    if "day" in names:
+        inputs.append("day")
+    if "market" in names:
+        inputs.append("market")
+    return tuple(inputs)
+
+
+def resolve_decider(agent, engine):
+    """
+    Bind an agent's decide() into a plan `fn(sector, day) -> decision` once, at
+    registration. Agents declare what they need through DECIDE_INPUTS:
+      "state"  -> decide(sector, state=agent._build_state(sector))
+      "day"    -> decide(sector, day=day)
+      "market" -> decide(sector, market=engine)
+    """
+    inputs = getattr(agent, "DECIDE_INPUTS", None)
+    if inputs is None:
+        inputs = infer_decide_inputs(agent)
+    unknown = set(inputs) - set(DECIDE_INPUTS)
+    if unknown:
+        raise ValueError(f"{agent.name}: unknown DECIDE_INPUTS {sorted(unknown)}")
+
+    decide = agent.decide
+    wants_state = "state" in inputs
+    wants_day = "day" in inputs
+    wants_market = "market" in inputs
+    build_state = agent._build_state if wants_state else None
+
+    if not inputs:
+        return lambda sector, day: decide(sector)
+    if inputs == ("state",):
+        return lambda sector, day: decide(sector, state=build_state(sector))
+    if inputs == ("day",):
+        return lambda sector, day: decide(sector, day=day)
+
+    def plan(sector, day):
+        kwargs = {}
+        if wants_state:
+            kwargs["state"] = build_state(sector)
+        if wants_day:
+            kwargs["day"] = day
+        if wants_market:
+            kwargs["market"] = engine
+        return decide(sector, **kwargs)
+    return plan
+
+
+def resolve_batch_decider(agent):
+    """
+    Agents that can act on every sector in one call expose
+    decide_all(sectors, day) -> [decision per sector]. Returns None otherwise.
+    """
+    return getattr(agent, "decide_all", None)
+
+
+def resolve_executor(agent):
+    """
+    Agents that settle their own trades (e.g. a whole GA population) expose
+    execute_day(sectors, day) -> sectors x (bought, sold) market flow, or None
+    when they trade as price-takers. Returns None for ordinary agents.
+    """
+    return getattr(agent, "execute_day", None)
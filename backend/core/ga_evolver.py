@@ -1,12 +1,18 @@
 # core/ga_evolver.py
 
+import math
+import os
 import random
 import numpy as np
 import copy
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import trange
 from core.sector import Sector
 from agents.genetic_trader_agent import GeneticTrader
-from core.market_engine import MarketEngine
+from agents.genetic_population_agent import GeneticPopulation
+from core.market_engine import MarketEngine, capture_rng_state, restore_rng_state
 
 
 PARAM_SPACE = {
@@ -47,21 +53,134 @@ def crossover(g1, g2):
     return child
 
 
-def evaluate_genome(genome, background_agents, sectors, eval_days=15, seed=None):
-    if seed:
+def build_eval_snapshot(background_agents, sectors, warmup_days=0, seed=None, market_config=None):
+    """
+    Warm a market with private copies of the background agents for
+    `warmup_days` and freeze it. Every candidate is then scored on a fork of
+    this snapshot, so all start from the same state and the warm-up runs once.
+    """
+    with _isolated_rng():
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed)
+        engine = MarketEngine(copy.deepcopy(list(background_agents)), sectors_config=sectors,
+                              market_config=market_config)
+        for day in range(1, warmup_days + 1):
+            engine.simulate_day(day)
+        return engine.snapshot()
+
+
+def _worth_on_snapshot(snapshot, genome, eval_days, seed=None):
+    engine = snapshot.fork()
+    if seed is not None:
         random.seed(seed)
         np.random.seed(seed)
 
     trader = GeneticTrader("GA_Test", genome=genome, track_history=False)
-    agents = background_agents + [trader]
-
-    engine = MarketEngine(agents, sectors_config=sectors)
+    engine.add_agent(trader)
     daily_worth = []
 
-    for day in range(1, eval_days + 1):
+    for day in range(snapshot.day + 1, snapshot.day + eval_days + 1):
         engine.simulate_day(day)
         daily_worth.append(trader.net_worth)
+    return daily_worth
+
+
+def evaluate_on_snapshot(snapshot, genome, eval_days=15, seed=None):
+    return _fitness(_worth_on_snapshot(snapshot, genome, eval_days, seed))
+
+
+def evaluate_population(snapshot, genomes, eval_days=15, seed=None, impact=None):
+    """Score a whole population in one forked simulation; returns one fitness per genome."""
+    engine = snapshot.fork()
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+    population = GeneticPopulation("GA_Population", genomes, impact=impact)
+    engine.add_agent(population)
+    for day in range(snapshot.day + 1, snapshot.day + eval_days + 1):
+        engine.simulate_day(day)
+
+    worth = population.worth_matrix()
+    return [_fitness(worth[:, n].tolist()) for n in range(population.size)]
+
+
+def racing_horizons(eval_days, eta=2, min_days=None):
+    """
+    Rung lengths for successive halving, shortest first, ending at eval_days.
+    min_days defaults to half of eval_days: shorter runs rank genomes mostly on noise.
+    """
+    if min_days is None:
+        min_days = math.ceil(eval_days / 2)
+    horizons = [eval_days]
+    while math.ceil(horizons[0] / eta) >= max(2, min_days) and math.ceil(horizons[0] / eta) < horizons[0]:
+        horizons.insert(0, math.ceil(horizons[0] / eta))
+    return horizons
+
+
+def evaluate_racing(snapshot, genomes, eval_days=15, seed=None, eta=2, min_days=None, keep_min=1,
+                    pool=None, should_stop=None):
+    """
+    Successive halving: every genome runs the shortest horizon, the best
+    1/eta (at least keep_min) continue to the next rung, and
+    so on up to eval_days. In-process, survivors resume their own forked
+    engine and RNG stream; with a `pool` (initialised by _init_worker) each
+    rung's survivors are re-run from the snapshot in parallel. Either way a
+    genome that reaches eval_days gets the same fitness as evaluate_on_snapshot.
+    Returns (fitnesses, horizons_reached); dropped genomes keep their last score.
+    should_stop, if given, is called before each rung and may raise to abort.
+    """
+    horizons = racing_horizons(eval_days, eta, min_days)
+    runs = [None] * len(genomes)
+    if pool is None:
+        for i, genome in enumerate(genomes):
+            engine = snapshot.fork()
+            if seed is not None:
+                random.seed(seed)
+                np.random.seed(seed)
+            trader = GeneticTrader("GA_Test", genome=genome, track_history=False)
+            engine.add_agent(trader)
+            runs[i] = {"engine": engine, "trader": trader, "worth": [], "rng": capture_rng_state()}
+
+    fitnesses = [0.0] * len(genomes)
+    reached = [0] * len(genomes)
+    alive = list(range(len(genomes)))
+    done = 0
+    for rung, horizon in enumerate(horizons):
+        if should_stop is not None:
+            should_stop()
+        if pool is not None:
+            worths = list(pool.map(_worth_task, [(genomes[i], seed, horizon) for i in alive]))
+        else:
+            worths = []
+            for i in alive:
+                run = runs[i]
+                restore_rng_state(run["rng"])
+                for day in range(snapshot.day + done + 1, snapshot.day + horizon + 1):
+                    run["engine"].simulate_day(day)
+                    run["worth"].append(run["trader"].net_worth)
+                run["rng"] = capture_rng_state()
+                worths.append(run["worth"])
+        for i, worth in zip(alive, worths):
+            fitnesses[i] = _fitness(worth)
+            reached[i] = horizon
+        done = horizon
+        if rung < len(horizons) - 1:
+            keep = max(keep_min, math.ceil(len(alive) / eta))
+            ranked = sorted(alive, key=lambda i: fitnesses[i], reverse=True)
+            for i in ranked[keep:]:
+                runs[i] = None
+            alive = ranked[:keep]
+    return fitnesses, reached
+
+
+def evaluate_genome(genome, background_agents, sectors, eval_days=15, seed=None, market_config=None):
+    snapshot = build_eval_snapshot(background_agents, sectors, market_config=market_config)
+    return evaluate_on_snapshot(snapshot, genome, eval_days, seed=seed)
+
 
+def _fitness(daily_worth):
     if len(daily_worth) < 2:
         return 0.0
 
@@ -75,6 +194,62 @@ def evaluate_genome(genome, background_agents, sectors, eval_days=15, seed=None)
     fitness = (0.7 * sharpe_like) + (0.3 * (final_networth / 100000.0))
     return fitness
 
+
+# Per-worker evaluation context, installed once by the pool initializer so the
+# warmed-up market snapshot is not re-sent with every genome. Only pool worker
+# processes set it; in-process evaluation passes its context explicitly, so
+# concurrent evolve() calls in one process cannot see each other's snapshot.
+_WORKER_CONTEXT = None
+
+
+def _init_worker(snapshot, eval_days):
+    global _WORKER_CONTEXT
+    _WORKER_CONTEXT = (snapshot, eval_days)
+
+
+def _evaluate_task(task, context=None):
+    """Score one (genome, seed) pair on a fresh fork of the shared snapshot."""
+    genome, seed = task
+    snapshot, eval_days = context if context is not None else _WORKER_CONTEXT
+    return evaluate_on_snapshot(snapshot, genome, eval_days, seed=seed)
+
+
+@contextmanager
+def _isolated_rng():
+    """Leave the caller's global RNG state untouched, as a worker process would."""
+    py_state, np_state = random.getstate(), np.random.get_state()
+    try:
+        yield
+    finally:
+        random.setstate(py_state)
+        np.random.set_state(np_state)
+
+
+def _worth_task(task):
+    """Daily net worth of one (genome, seed, days) run on the worker's snapshot."""
+    genome, seed, days = task
+    snapshot, _ = _WORKER_CONTEXT
+    return _worth_on_snapshot(snapshot, genome, days, seed=seed)
+
+
+def _evaluate_local(tasks, snapshot, eval_days):
+    context = (snapshot, eval_days)
+    with _isolated_rng():
+        return [_evaluate_task(task, context) for task in tasks]
+
+
+def evolution_hyperparams(**kwargs):
+    """evolve() keyword arguments that change its result, for cache keys."""
+    keys = ("pop_size", "generations", "eval_days", "elite_frac", "mutation_rate",
+            "warmup_days", "population_mode", "population_impact",
+            "racing", "racing_eta", "racing_min_days")
+    return {k: kwargs[k] for k in keys if k in kwargs}
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
 def evolve(
     pop_size=20,
     generations=10,
@@ -84,7 +259,33 @@ def evolve(
     elite_frac=0.2,
     mutation_rate=0.3,
     seed=None,
+    workers=1,
+    warmup_days=0,
+    population_mode=False,
+    population_impact=None,
+    initial_population=None,
+    racing=False,
+    racing_eta=2,
+    racing_min_days=None,
+    market_config=None,
+    should_stop=None,
 ):
+    """
+    Evolve GeneticTrader genomes. The background market is warmed up once and
+    every candidate is scored on a fork of it with its generation's seed, so
+    fitness does not depend on evaluation order and `workers` > 1 (a process
+    pool) returns the same result as 1.
+
+    population_mode scores each generation in a single simulation through
+    GeneticPopulation (see its `impact` modes) instead of one run per genome.
+    initial_population (e.g. cached elites) seeds generation 0; the rest is random.
+    racing evaluates each generation by successive halving (evaluate_racing),
+    on the pool when workers > 1; genomes are then ranked by horizon reached,
+    then fitness.
+    market_config (a MarketConfig) sets the evaluation market; None uses the defaults.
+    should_stop is called between generations (and racing rungs) and may
+    raise, e.g. JobContext.check_cancelled, to abandon the evolution.
+    """
     if background_agents is None:
         background_agents = []
     if sectors is None:
@@ -93,44 +294,87 @@ def evolve(
     if seed:
         random.seed(seed)
         np.random.seed(seed)
+    # Task seeds come from a dedicated stream so they don't shift with the
+    # draws made by the evaluations themselves.
+    seed_rng = random.Random(seed if seed is not None else random.getrandbits(64))
 
-    population = [random_genome() for _ in range(pop_size)]
+    population = [dict(g) for g in (initial_population or [])][:pop_size]
+    population += [random_genome() for _ in range(pop_size - len(population))]
+    elites = []
     best_genome = None
     best_fitness = -float("inf")
 
-    for gen in trange(generations, desc="Evolving GA Traders"):
-        fitnesses = []
+    snapshot = build_eval_snapshot(background_agents, sectors, warmup_days, seed=seed_rng.getrandbits(32),
+                                   market_config=market_config)
 
-        for genome in population:
-            fit = evaluate_genome(genome, background_agents, sectors, eval_days)
-            fitnesses.append(fit)
+    workers = max(1, int(workers or 1))
+    pool = None
+    n_elite = max(1, int(pop_size * elite_frac))
+    if workers > 1 and not population_mode:
+        # spawn: the server process has live threads (uvicorn, torch), which fork does not survive safely.
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, pop_size),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(snapshot, eval_days),
+        )
 
-        ranked = sorted(zip(population, fitnesses), key=lambda x: x[1], reverse=True)
-        best_genome_gen, best_fit_gen = ranked[0]
+    try:
+        for gen in trange(generations, desc="Evolving GA Traders"):
+            if should_stop is not None:
+                should_stop()
+            # Common random numbers: one noise seed per generation, shared by all candidates.
+            gen_seed = seed_rng.getrandbits(32)
+            tasks = [(genome, gen_seed) for genome in population]
+            reached = None
+            if racing:
+                with _isolated_rng():
+                    fitnesses, reached = evaluate_racing(snapshot, population, eval_days, gen_seed,
+                                                         racing_eta, racing_min_days, keep_min=max(2, n_elite),
+                                                         pool=pool, should_stop=should_stop)
+            elif population_mode:
+                with _isolated_rng():
+                    fitnesses = evaluate_population(snapshot, population, eval_days, gen_seed, population_impact)
+            elif pool is not None:
+                fitnesses = list(pool.map(_evaluate_task, tasks))
+            else:
+                fitnesses = _evaluate_local(tasks, snapshot, eval_days)
 
-        if best_fit_gen > best_fitness:
-            best_genome = best_genome_gen
-            best_fitness = best_fit_gen
+            if reached is None:
+                ranked = sorted(zip(population, fitnesses), key=lambda x: x[1], reverse=True)
+            else:
+                order = sorted(range(len(population)), key=lambda i: (reached[i], fitnesses[i]), reverse=True)
+                ranked = [(population[i], fitnesses[i]) for i in order]
+            best_genome_gen, best_fit_gen = ranked[0]
 
-        print(
-            f"Gen {gen+1}/{generations} | Best This Gen: {best_fit_gen:.4f} | "
-            f"Overall Best: {best_fitness:.4f}"
-        )
+            if best_fit_gen > best_fitness:
+                best_genome = best_genome_gen
+                best_fitness = best_fit_gen
+
+            print(
+                f"Gen {gen+1}/{generations} | Best This Gen: {best_fit_gen:.4f} | "
+                f"Overall Best: {best_fitness:.4f}"
+            )
 
-        n_elite = max(1, int(pop_size * elite_frac))
-        elites = [p for p, _ in ranked[:n_elite]]
+            elites = [p for p, _ in ranked[:n_elite]]
 
-        new_population = elites.copy()
-        while len(new_population) < pop_size:
-            p1, p2 = random.sample(elites, 2)
-            child = crossover(p1, p2)
-            child = mutate(child, rate=mutation_rate)
-            new_population.append(child)
+            new_population = elites.copy()
+            while len(new_population) < pop_size:
+                p1, p2 = random.sample(elites, 2)
+                child = crossover(p1, p2)
+                child = mutate(child, rate=mutation_rate)
+                new_population.append(child)
 
-        population = new_population
+            population = new_population
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     print("\nEvolution Complete!")
     print(f" Best Fitness: {best_fitness:.4f}")
     print(f"Best Genome: {best_genome}")
 
-    return {"best_genome": best_genome, "best_fitness": best_fitness}
+    final_elites = [g for g in elites if g is not best_genome]
+    if best_genome is not None:
+        final_elites.insert(0, best_genome)
+    return {"best_genome": best_genome, "best_fitness": best_fitness, "elites": final_elites}
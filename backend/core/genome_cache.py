@@ -0,0 +1,98 @@
+# core/genome_cache.py
+
+import hashlib
+import json
+import os
+import time
+
+# Bump when the fitness function or genome encoding changes so old entries stop matching.
+CACHE_VERSION = 1
+
+
+def _digest(payload) -> str:
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def agent_signature(agent):
+    return [type(agent).__module__, type(agent).__name__, agent.name]
+
+
+def sectors_key(sectors) -> str:
+    return _digest({"version": CACHE_VERSION, "sectors": sorted(dict(sectors).items())})
+
+
+def evolution_key(sectors, background_agents, hyperparams: dict, seed=None, param_space=None,
+                  market_config=None) -> str:
+    """Hash of everything that determines an evolve() result."""
+    payload = {
+        "version": CACHE_VERSION,
+        "sectors": sorted(dict(sectors).items()),
+        "background": [agent_signature(a) for a in background_agents],
+        "hyperparams": hyperparams,
+        "seed": seed,
+        "param_space": param_space,
+    }
+    # Only non-default markets change the key, so existing entries keep matching.
+    if market_config is not None and market_config != market_config.default():
+        payload["market_config"] = market_config.to_dict()
+    return _digest(payload)
+
+
+class GenomeCache:
+    """
+    Evolved genomes on disk, one JSON file per evolution key. Entries keep the
+    best genome and the final elites, so a changed configuration for the same
+    sectors can warm-start from them instead of a random population.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable genome cache entry {path}: {e}")
+            return None
+
+    def put(self, key: str, result: dict, sectors=None, meta=None):
+        entry = {
+            "key": key,
+            "created": time.time(),
+            "sectors_key": sectors_key(sectors) if sectors is not None else None,
+            "best_genome": result["best_genome"],
+            "best_fitness": result["best_fitness"],
+            "elites": result.get("elites", []),
+            "meta": meta or {},
+        }
+        path = self._path(key)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp, path)
+        return entry
+
+    def entries(self):
+        for name in os.listdir(self.root):
+            if name.endswith(".json"):
+                entry = self.get(name[:-len(".json")])
+                if entry is not None:
+                    yield entry
+
+    def warm_start_elites(self, sectors, limit=None):
+        """Elites of the most recent entry evolved on the same sectors, best first."""
+        want = sectors_key(sectors)
+        matches = [e for e in self.entries() if e.get("sectors_key") == want and e.get("elites")]
+        if not matches:
+            return []
+        latest = max(matches, key=lambda e: e.get("created", 0))
+        return latest["elites"][:limit] if limit else list(latest["elites"])
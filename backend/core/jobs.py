@@ -0,0 +1,235 @@
+# core/jobs.py
+
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+TERMINAL_STATES = ("COMPLETE", "FAILED", "CANCELLED")
+# Ids are generated by JobManager.submit; anything else (e.g. "..") never names a job directory.
+JOB_ID_PATTERN = re.compile(r"[0-9a-f]{12}")
+
+
+def valid_job_id(job_id) -> bool:
+    return isinstance(job_id, str) and JOB_ID_PATTERN.fullmatch(job_id) is not None
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """
+    Handle a running job uses to report progress. Status lives in
+    <output_dir>/status.json so any process can read it; cancellation is a
+    flag file the worker polls between simulation steps.
+    """
+
+    def __init__(self, job_id: str, output_dir: str):
+        self.job_id = job_id
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self._state = {"job_id": job_id}
+
+    @property
+    def status_path(self):
+        return os.path.join(self.output_dir, "status.json")
+
+    @property
+    def cancel_path(self):
+        return os.path.join(self.output_dir, "cancel")
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.output_dir, name)
+
+    def update(self, **fields):
+        self._state.update(fields)
+        self._state["updated"] = time.time()
+        tmp = self.status_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._state, f)
+        os.replace(tmp, self.status_path)
+
+    def set(self, **fields):
+        """Replace the reported state (keeps the job id)."""
+        self._state = {"job_id": self.job_id}
+        self.update(**fields)
+
+    def read(self):
+        try:
+            with open(self.status_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def cancelled(self) -> bool:
+        return os.path.exists(self.cancel_path)
+
+    def check_cancelled(self):
+        if self.cancelled():
+            raise JobCancelled(self.job_id)
+
+
+def _run_job(fn, config, job):
+    job.update(pid=os.getpid())
+    return fn(config, job)
+
+
+def _process_alive(pid) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobManager:
+    """
+    Queue of simulation jobs executed on a bounded process pool. Each job gets
+    an id and its own directory under <root>/jobs/<id>; status and results are
+    read back from there, so they survive the worker and a server restart.
+    Whatever a job function returns is passed to on_result(job_id, result)
+    in this process. Job ids from callers are validated before they touch
+    the filesystem.
+    """
+
+    def __init__(self, root: str, max_workers: int = 2, on_result=None):
+        self.root = os.path.join(root, "jobs")
+        self.max_workers = max_workers
+        self.on_result = on_result
+        os.makedirs(self.root, exist_ok=True)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._order = []
+        self._latest_complete = None
+
+    def recover(self):
+        """
+        Re-list jobs left on disk by an earlier server process, oldest first.
+        Unfinished jobs whose worker (or, while queued, server) process is
+        gone are marked FAILED; live ones are left alone.
+        """
+        found, complete = [], []
+        for job_id in os.listdir(self.root):
+            if job_id in self._futures or not self.exists(job_id):
+                continue
+            job = self.context(job_id)
+            state = job.read()
+            if state is None:
+                continue
+            owner = state.get("pid") or state.get("server_pid")
+            if state.get("status") not in TERMINAL_STATES and not _process_alive(owner):
+                # Its worker died with the previous server process.
+                job.set(**dict(state, status="FAILED", error="Interrupted by server restart"))
+            found.append((state.get("submitted", 0.0), job_id))
+            if state.get("status") == "COMPLETE":
+                complete.append((state.get("submitted", 0.0), job_id))
+        with self._lock:
+            self._order = [job_id for _, job_id in sorted(found)] + self._order
+        if complete:
+            self._mark_complete(max(complete)[1])
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                # spawn: the API process runs threads that fork would copy mid-flight.
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def context(self, job_id: str) -> JobContext:
+        if not valid_job_id(job_id):
+            raise ValueError(f"Invalid job id {job_id!r}")
+        return JobContext(job_id, os.path.join(self.root, job_id))
+
+    def exists(self, job_id: str) -> bool:
+        return valid_job_id(job_id) and os.path.isdir(os.path.join(self.root, job_id))
+
+    def submit(self, fn, config: dict, total_days: int = 0) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        job = self.context(job_id)
+        job.set(status="QUEUED", day=0, total_days=total_days, submitted=time.time(), server_pid=os.getpid())
+        with self._lock:
+            try:
+                future = self._executor().submit(_run_job, fn, config, job)
+            except BrokenProcessPool:
+                self._pool = None
+                future = self._executor().submit(_run_job, fn, config, job)
+            self._futures[job_id] = future
+            self._order.append(job_id)
+        future.add_done_callback(lambda f, job=job: self._on_done(job, f))
+        return job_id
+
+    def _on_done(self, job, future):
+        if future.cancelled():
+            job.set(status="CANCELLED")
+            return
+        error = future.exception()
+        if error is None:
+            if (job.read() or {}).get("status") == "COMPLETE":
+                self._mark_complete(job.job_id)
+            result = future.result()
+            if self.on_result is not None and result is not None:
+                try:
+                    self.on_result(job.job_id, result)
+                except Exception as e:
+                    print(f"⚠️ on_result failed for job {job.job_id}: {e}")
+            return
+        if isinstance(error, BrokenProcessPool):
+            with self._lock:
+                self._pool = None
+        state = job.read() or {}
+        if state.get("status") not in TERMINAL_STATES:
+            job.set(status="FAILED", error=str(error) or type(error).__name__)
+
+    def status(self, job_id: str):
+        if not self.exists(job_id):
+            return None
+        job = self.context(job_id)
+        state = job.read() or {"job_id": job_id, "status": "UNKNOWN"}
+        if state.get("status") not in TERMINAL_STATES and job.cancelled():
+            state["cancel_requested"] = True
+        return state
+
+    def cancel(self, job_id: str):
+        if not self.exists(job_id):
+            return None
+        job = self.context(job_id)
+        future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            job.set(status="CANCELLED")
+        elif (job.read() or {}).get("status") not in TERMINAL_STATES:
+            open(job.cancel_path, "w").close()
+        return self.status(job_id)
+
+    def list(self):
+        return [self.status(job_id) for job_id in self._order]
+
+    def _mark_complete(self, job_id: str):
+        """Track the most recently submitted COMPLETE job, so latest(completed=True) reads no status files."""
+        with self._lock:
+            current = self._latest_complete
+            if current is None or self._order.index(job_id) > self._order.index(current):
+                self._latest_complete = job_id
+
+    def latest(self, completed: bool = False):
+        """Most recently submitted job id (optionally the latest COMPLETE one)."""
+        if completed:
+            return self._latest_complete
+        return self._order[-1] if self._order else None
+
+    def shutdown(self, wait: bool = False):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
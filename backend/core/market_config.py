@@ -0,0 +1,99 @@
+# core/market_config.py
+
+import dataclasses
+from dataclasses import dataclass
+import numpy as np
+import utils.config as defaults
+
+
+def _frozen_items(mapping):
+    """Mapping -> tuple of (key, value) pairs, so the config stays hashable and picklable."""
+    if mapping is None:
+        return ()
+    items = mapping.items() if hasattr(mapping, "items") else mapping
+    return tuple((k, v) for k, v in items)
+
+
+@dataclass(frozen=True)
+class MarketConfig:
+    """
+    Immutable market and trading parameters for one run. The defaults are the
+    values in utils/config.py; a run that needs different ones builds its own
+    instance (MarketConfig.default().replace(...)) and hands it to MarketEngine
+    instead of patching module globals, so runs in one process cannot see each
+    other's settings.
+    """
+
+    kappa: float = defaults.KAPPA
+    sigma_noise: float = defaults.SIGMA_NOISE
+    news_cap_normal: float = defaults.NEWS_CAP_NORMAL
+    news_cap_shock: float = defaults.NEWS_CAP_SHOCK
+    max_daily_move: float = defaults.MAX_DAILY_MOVE
+    liquidity: tuple = _frozen_items(defaults.LIQUIDITY)
+    default_liquidity: float = 1_000_000
+    impact_alpha: float = defaults.IMPACT_ALPHA
+    spillover: tuple = _frozen_items(defaults.SPILLOVER)
+
+    starting_cash: float = defaults.STARTING_CASH
+    initial_holdings_prob: float = defaults.INITIAL_HOLDINGS_PROB
+    initial_holdings_max: int = defaults.INITIAL_HOLDINGS_MAX
+    order_qty_max: int = defaults.ORDER_QTY_MAX
+    order_cash_fraction: float = defaults.ORDER_CASH_FRACTION
+    transaction_cost: float = defaults.TRANSACTION_COST
+    inventory_limit: int = defaults.INVENTORY_LIMIT
+    p_explore: float = defaults.P_EXPLORE
+
+    def __post_init__(self):
+        object.__setattr__(self, "liquidity", _frozen_items(self.liquidity))
+        object.__setattr__(self, "spillover", _frozen_items(self.spillover))
+
+    @classmethod
+    def default(cls):
+        return DEFAULT_MARKET_CONFIG
+
+    def replace(self, **changes):
+        return dataclasses.replace(self, **changes)
+
+    def to_dict(self):
+        data = dataclasses.asdict(self)
+        data["liquidity"] = dict(self.liquidity)
+        data["spillover"] = [[src, tgt, w] for (src, tgt), w in self.spillover]
+        return data
+
+    def compile(self, sector_names):
+        return CompiledMarket(self, sector_names)
+
+
+class CompiledMarket:
+    """
+    A MarketConfig laid out against one engine's sector order: a liquidity
+    vector and the spillover links as index arrays (plus the equivalent
+    sectors x sectors matrix), so simulate_day does no name lookups.
+    """
+
+    def __init__(self, config: MarketConfig, sector_names):
+        self.config = config
+        self.sector_names = list(sector_names)
+        index = {name: i for i, name in enumerate(self.sector_names)}
+        liquidity = dict(config.liquidity)
+        self.liquidity = np.array(
+            [liquidity.get(name, config.default_liquidity) for name in self.sector_names], dtype=np.float64
+        )
+
+        # Links keep their configured order: each ripple sees the prices left by the previous one.
+        links = [(index[src], index[tgt], w) for (src, tgt), w in config.spillover
+                 if src in index and tgt in index]
+        self.spill_src = np.array([l[0] for l in links], dtype=np.int64)
+        self.spill_tgt = np.array([l[1] for l in links], dtype=np.int64)
+        self.spill_weight = np.array([l[2] for l in links], dtype=np.float64)
+
+    @property
+    def spillover_matrix(self):
+        """sectors x sectors weights, [source, target]."""
+        n = len(self.sector_names)
+        matrix = np.zeros((n, n), dtype=np.float64)
+        np.add.at(matrix, (self.spill_src, self.spill_tgt), self.spill_weight)
+        return matrix
+
+
+DEFAULT_MARKET_CONFIG = MarketConfig()
@@ -1,47 +1,176 @@
 # core/market_engine.py
 import math
+import pickle
 import random
+import sys
+from collections import Counter
+import numpy as np
 from core.sector import Sector
-from utils.config import (
-    KAPPA, SIGMA_NOISE, NEWS_CAP_NORMAL, NEWS_CAP_SHOCK, MAX_DAILY_MOVE,
-    LIQUIDITY, IMPACT_ALPHA, SPILLOVER, TRANSACTION_COST
-)
+from core.portfolio_store import PortfolioStore, buy_cap
+from core.order_flow import OrderFlowStats, BUY, SELL
+from core.transaction_store import TransactionLog
+from core.news_effects import NewsEffectTable
+from core.dispatch import resolve_decider, resolve_batch_decider, resolve_executor
+from core.market_config import MarketConfig
 
 class MarketEngine:
-    def __init__(self, agents, sectors_config):
+    def __init__(self, agents, sectors_config, vectorized_portfolios=True, market_config: MarketConfig = None):
         self.agents = agents
+        self.config = market_config if market_config is not None else MarketConfig.default()
         self.sectors = [Sector(name, price) for name, price in sectors_config.items()]
-        self.transaction_log = []  
+        self.market = self.config.compile([s.name for s in self.sectors])
+        self.transaction_log = TransactionLog([s.name for s in self.sectors])
         self.agent_snapshots = []   
-        self.news_effects = None   
+        self.day = 0
+        self._news_table = None
         self.herd_memory = {}       
 
         for s in self.sectors:
             s.fundamental = s.history[0] if s.history else s.price
 
+        sector_names = [s.name for s in self.sectors]
+        self.order_flow = OrderFlowStats(sector_names)
+        self.decision_errors = Counter()
+        self._deciders = {}
+        self._batch_deciders = {}
+        self._executors = {}
+        self._day_stages = {}
+        self.portfolios = None
+        if vectorized_portfolios:
+            self.portfolios = PortfolioStore(sector_names, capacity=len(agents))
+        for agent in agents:
+            self._register_agent(agent)
+
+    def _register_agent(self, agent):
+        if hasattr(agent, "bind_config"):
+            agent.bind_config(self.config)
+        if self.portfolios is not None:
+            self.portfolios.attach(agent)
+        if hasattr(agent, "attach_engine"):
+            agent.attach_engine(self)
+        self._bind_dispatch(agent)
+
+    def _bind_dispatch(self, agent):
+        self._deciders[id(agent)] = resolve_decider(agent, self)
+        self._batch_deciders[id(agent)] = resolve_batch_decider(agent)
+        self._executors[id(agent)] = resolve_executor(agent)
+        if hasattr(type(agent), "prepare_day"):
+            self._day_stages.setdefault(type(agent), []).append(agent)
+
+    def add_agent(self, agent):
+        """Join an agent to a market that is already running (e.g. a forked warm-up)."""
+        self.agents.append(agent)
+        self._register_agent(agent)
+
+    def snapshot(self):
+        """Freeze the engine, its sectors and agents, and the global RNG state."""
+        return EngineSnapshot(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Decider plans are closures keyed by id(agent); they are rebuilt on load.
+        for key in ("_deciders", "_batch_deciders", "_executors", "_day_stages"):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._deciders, self._batch_deciders, self._executors, self._day_stages = {}, {}, {}, {}
+        for agent in self.agents:
+            self._bind_dispatch(agent)
+
+    def _run_day_stages(self, day):
+        """Per-class batch work (e.g. batched LSTM inference) done once before agents act."""
+        for cls, members in self._day_stages.items():
+            try:
+                cls.prepare_day(members, self.sectors, day)
+            except Exception:
+                self.decision_errors[f"{cls.__name__}.prepare_day"] += 1
+
+    def _mark_to_market(self, prices):
+        if self.portfolios is not None:
+            price_vec = np.array([s.price for s in self.sectors], dtype=np.float64)
+            values = self.portfolios.values(price_vec)
+            return values[[agent._row for agent in self.agents]].tolist()
+        return [agent.portfolio_value(prices) for agent in self.agents]
+
+    def _record_snapshots(self, day, prices):
+        """Append each agent's end-of-day value to wealth_history and its row to agent_snapshots."""
+        values = [round(v, 2) for v in self._mark_to_market(prices)]
+        if self.portfolios is None:
+            for agent, total_val in zip(self.agents, values):
+                agent.wealth_history.append(total_val)
+                log_entry = {"Day": day, "Agent": agent.name, "TotalValue": total_val}
+                log_entry.update(agent.get_snapshot_data())
+                self.agent_snapshots.append(log_entry)
+            return
+
+        # Cash and holdings come straight from the store's arrays; same fields as get_snapshot_data().
+        store = self.portfolios
+        rows = [agent._row for agent in self.agents]
+        names = store.sector_names
+        cash = store.cash[rows].tolist()
+        held = store.holdings[rows].tolist()
+        for agent, total_val, agent_cash, agent_held in zip(self.agents, values, cash, held):
+            agent.wealth_history.append(total_val)
+            log_entry = {"Day": day, "Agent": agent.name, "TotalValue": total_val, "Cash": agent_cash}
+            log_entry.update(zip(names, agent_held))
+            self.agent_snapshots.append(log_entry)
+
+    def _apply_flow(self, agent, execute, day, net_qty):
+        """Market side of a self-settling agent: its net flow moves prices and shows in order flow."""
+        try:
+            flow = execute(self.sectors, day)
+        except Exception:
+            self.decision_errors[agent.name] += 1
+            return
+        if flow is None:
+            return
+        for sector_idx, sector in enumerate(self.sectors):
+            bought, sold = int(flow[sector_idx][0]), int(flow[sector_idx][1])
+            if bought > 0:
+                net_qty[sector.name] += bought
+                self.order_flow.record(day, sector_idx, BUY, sector.price, bought)
+            if sold > 0:
+                net_qty[sector.name] -= sold
+                self.order_flow.record(day, sector_idx, SELL, sector.price, sold)
+
     def _aggregate_orders(self, day):
         
         net_qty = {s.name: 0 for s in self.sectors}
+        self._run_day_stages(day)
+        # With the store, fills settle directly on its arrays instead of through
+        # each agent's cash property and holdings view.
+        store = self.portfolios
+        cost_rate = self.config.transaction_cost
+        inventory_limit = self.config.inventory_limit
 
         for agent in self.agents:
-            for sector in self.sectors:
-                state = None
-                if hasattr(agent, "_build_state"):
-                    try:
-                        state = agent._build_state(sector)
-                    except Exception:
-                        state = None
-
+            execute = self._executors.get(id(agent))
+            if execute is not None:
+                self._apply_flow(agent, execute, day, net_qty)
+                continue
+            # Interned on the first fill, so the log's name table only lists agents that traded.
+            agent_id = None
+            decide = self._deciders.get(id(agent))
+            if decide is None:
+                decide = self._deciders[id(agent)] = resolve_decider(agent, self)
+            decisions = None
+            decide_all = self._batch_deciders.get(id(agent))
+            if decide_all is not None:
                 try:
-                    if state is not None:
-                        decision = agent.decide(sector, state)
-                    else:
-                        decision = agent.decide(sector)
-                except TypeError:
+                    decisions = decide_all(self.sectors, day)
+                except Exception:
+                    self.decision_errors[agent.name] += 1
+                    decisions = [("HOLD", 0)] * len(self.sectors)
+            for sector_idx, sector in enumerate(self.sectors):
+                if decisions is not None:
+                    decision = decisions[sector_idx]
+                else:
                     try:
-                        decision = agent.decide(sector, day)
-                    except Exception as e:
-                        print(f"⚠️ Agent {getattr(agent,'name', '?')} decide error: {e}")
+                        decision = decide(sector, day)
+                    except Exception:
+                        self.decision_errors[agent.name] += 1
                         decision = ("HOLD", 0)
 
                 if isinstance(decision, tuple):
@@ -50,91 +179,95 @@ class MarketEngine:
                     action, qty = decision, 0
 
                 if action == "BUY" and qty > 0:
-                    max_qty = agent.can_buy_max(sector.price, qty, 0.10)
-                    exec_qty = min(qty, max_qty)
+                    if store is not None:
+                        cash = float(store.cash[agent._row])
+                        exec_qty = min(qty, buy_cap(cash, sector.price, qty, 0.10, inventory_limit))
+                    else:
+                        cash = agent.cash
+                        exec_qty = min(qty, agent.can_buy_max(sector.price, qty, 0.10))
                     if exec_qty > 0:
-                        cost = sector.price * exec_qty * (1 + TRANSACTION_COST)
-                        if agent.cash >= cost:
-                            agent.buy(sector.name, sector.price, exec_qty)
+                        cost = sector.price * exec_qty * (1 + cost_rate)
+                        if cash >= cost:
+                            if store is not None:
+                                store.settle_buy(agent._row, sector_idx, exec_qty, cost, inventory_limit)
+                            else:
+                                agent.buy(sector.name, sector.price, exec_qty)
                             net_qty[sector.name] += exec_qty
-                            self.transaction_log.append({
-                                "Agent": agent.name,
-                                "Day": day,
-                                "Sector": sector.name,
-                                "Action": "BUY",
-                                "Price": sector.price,
-                                "Qty": exec_qty
-                            })
+                            self.order_flow.record(day, sector_idx, BUY, sector.price, exec_qty)
+                            if agent_id is None:
+                                agent_id = self.transaction_log.agent_id(agent.name)
+                            self.transaction_log.record(day, agent_id, sector_idx, BUY, sector.price, exec_qty)
 
                 elif action == "SELL" and qty > 0:
-                    held = agent.holdings.get(sector.name, 0)
+                    if store is not None:
+                        held = int(store.holdings[agent._row, sector_idx])
+                    else:
+                        held = agent.holdings.get(sector.name, 0)
                     exec_qty = min(qty, held)
                     if exec_qty > 0:
-                        agent.sell(sector.name, sector.price, exec_qty)
+                        if store is not None:
+                            store.settle_sell(agent._row, sector_idx, exec_qty,
+                                              sector.price * exec_qty * (1 - cost_rate))
+                        else:
+                            agent.sell(sector.name, sector.price, exec_qty)
                         net_qty[sector.name] -= exec_qty
-                        self.transaction_log.append({
-                            "Agent": agent.name,
-                            "Day": day,
-                            "Sector": sector.name,
-                            "Action": "SELL",
-                            "Price": sector.price,
-                            "Qty": exec_qty
-                        })
+                        self.order_flow.record(day, sector_idx, SELL, sector.price, exec_qty)
+                        if agent_id is None:
+                            agent_id = self.transaction_log.agent_id(agent.name)
+                        self.transaction_log.record(day, agent_id, sector_idx, SELL, sector.price, exec_qty)
 
         return net_qty
 
-    def _get_news_effects(self, day):
+    @property
+    def news_effects(self):
+        return self._news_table
 
-        if self.news_effects is None:
-            return {s.name: 0.0 for s in self.sectors}
+    @news_effects.setter
+    def news_effects(self, source):
+        """Compile news effects (table, legacy DataFrame or news items) into a days x sectors array."""
+        self._news_table = NewsEffectTable.compile(source, [s.name for s in self.sectors])
 
-        try:
-            row = self.news_effects[self.news_effects["Day"] == day]
-            if row.empty:
-                return {s.name: 0.0 for s in self.sectors}
-            row_dict = row.iloc[0].to_dict()
-            return {s.name: row_dict.get(s.name, 0.0) for s in self.sectors}
-        except Exception:
-            return {s.name: 0.0 for s in self.sectors}
+    def _get_news_effects(self, day):
+        if self._news_table is None:
+            return np.zeros(len(self.sectors))
+        return self._news_table.row(day)
 
     def simulate_day(self, day):
+        cfg, market = self.config, self.market
         net_qty = self._aggregate_orders(day)
         news_pct = self._get_news_effects(day)
-        for s in self.sectors:
+        for i, s in enumerate(self.sectors):
             old = s.price
             Q = net_qty.get(s.name, 0)
-            V = LIQUIDITY.get(s.name, 1_000_000)
+            V = market.liquidity[i]
             if Q == 0:
                 impact_pct = 0.0
             else:
-                impact_pct = IMPACT_ALPHA * math.copysign(math.sqrt(abs(Q) / V), Q) * 100.0
+                impact_pct = cfg.impact_alpha * math.copysign(math.sqrt(abs(Q) / V), Q) * 100.0
             impact_factor = 1.0 + impact_pct / 100.0
 
-            nf_pct = news_pct.get(s.name, 0.0)
-            cap = NEWS_CAP_SHOCK if abs(nf_pct) > NEWS_CAP_NORMAL else NEWS_CAP_NORMAL
+            nf_pct = float(news_pct[i])
+            cap = cfg.news_cap_shock if abs(nf_pct) > cfg.news_cap_normal else cfg.news_cap_normal
             nf_pct = max(-cap, min(cap, nf_pct))
             news_factor = 1.0 + nf_pct / 100.0
 
-            noise = random.gauss(0, SIGMA_NOISE)
+            noise = random.gauss(0, cfg.sigma_noise)
 
-            reversion = KAPPA * (s.fundamental - s.price) / s.price
+            reversion = cfg.kappa * (s.fundamental - s.price) / s.price
 
             candidate = old * impact_factor * news_factor * (1.0 + noise)
             candidate += old * reversion
 
             pct_move = (candidate - old) / old * 100.0
-            pct_move = max(-MAX_DAILY_MOVE, min(MAX_DAILY_MOVE, pct_move))
+            pct_move = max(-cfg.max_daily_move, min(cfg.max_daily_move, pct_move))
             new_price = round(old * (1.0 + pct_move / 100.0), 2)
 
             s.price = new_price
             s.history.append(new_price)
 
-        for (src, tgt), weight in SPILLOVER.items():
-            try:
-                src_sector = next(x for x in self.sectors if x.name == src)
-                tgt_sector = next(x for x in self.sectors if x.name == tgt)
-            except StopIteration:
-                continue
+        for src, tgt, weight in zip(market.spill_src.tolist(), market.spill_tgt.tolist(),
+                                    market.spill_weight.tolist()):
+            src_sector, tgt_sector = self.sectors[src], self.sectors[tgt]
             if len(src_sector.history) < 2:
                 continue
             src_old = src_sector.history[-2]
@@ -148,29 +281,13 @@ class MarketEngine:
                 tgt_sector.history[-1] = tgt_sector.price
 
         prices = {s.name: s.price for s in self.sectors}
-        for txn in self.transaction_log:
-            if txn.get("Day") is None:
-                txn["Day"] = day
 
-        for agent in self.agents:
-            total_val = agent.portfolio_value(prices)
-            agent.wealth_history.append(round(total_val, 2))
-            holdings_data = agent.get_snapshot_data() 
-            
-            log_entry = {
-                "Day": day,
-                "Agent": agent.name,
-                "TotalValue": round(total_val, 2),
-            }
-            log_entry.update(holdings_data) 
-            
-            self.agent_snapshots.append(log_entry)
+        self._record_snapshots(day, prices)
 
+        self.order_flow.close_day(day)
+        self.day = day
         if hasattr(self, "herd_memory"):
-            for s in self.sectors:
-                buys = sum(1 for txn in self.transaction_log if txn["Day"] == day and txn["Sector"] == s.name and txn["Action"] == "BUY")
-                sells = sum(1 for txn in self.transaction_log if txn["Day"] == day and txn["Sector"] == s.name and txn["Action"] == "SELL")
-                self.herd_memory[s.name] = {"buy": buys, "sell": sells}
+            self.herd_memory.update(self.order_flow.day_counts(day))
 
         prices = {s.name: s.price for s in self.sectors}
         for agent in self.agents:
@@ -195,4 +312,39 @@ class MarketEngine:
                     print(f" Agent on_day_end error: {agent.name} {e}")
 
     def get_sector_data(self):
-        return {s.name: s.history for s in self.sectors}
+        return {s.name: s.history.tolist() for s in self.sectors}
+
+
+class EngineSnapshot:
+    """
+    Point-in-time copy of a MarketEngine (sectors, portfolios, agents, logs)
+    together with the random / numpy / torch RNG states. Stored as one pickle
+    payload, so a snapshot is immutable, cheap to ship to worker processes,
+    and every fork() is an independent engine with no state shared with the
+    original or with other forks.
+    """
+
+    def __init__(self, engine):
+        self.day = engine.day
+        self.payload = pickle.dumps((engine, capture_rng_state()), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def fork(self, restore_rng=True):
+        engine, rng_state = pickle.loads(self.payload)
+        if restore_rng:
+            restore_rng_state(rng_state)
+        return engine
+
+
+def capture_rng_state():
+    torch = sys.modules.get("torch")
+    return (random.getstate(), np.random.get_state(),
+            torch.get_rng_state() if torch is not None else None)
+
+
+def restore_rng_state(state):
+    py_state, np_state, torch_state = state
+    random.setstate(py_state)
+    np.random.set_state(np_state)
+    torch = sys.modules.get("torch")
+    if torch is not None and torch_state is not None:
+        torch.set_rng_state(torch_state)
@@ -0,0 +1,92 @@
+# core/news_effects.py
+
+from typing import Iterable, List
+import numpy as np
+import pandas as pd
+
+
+class NewsEffectTable:
+    """
+    Dense days x sectors table of news-driven percent moves. Row `d` holds the
+    effects for day `d` (row 0 is day 0 and stays zero), so a daily lookup is a
+    single row view.
+    """
+
+    def __init__(self, effects: np.ndarray, sector_names: List[str]):
+        self.effects = np.asarray(effects, dtype=np.float64)
+        self.sector_names = list(sector_names)
+        self._zeros = np.zeros(len(self.sector_names), dtype=np.float64)
+
+    @property
+    def num_days(self) -> int:
+        return len(self.effects) - 1
+
+    @classmethod
+    def empty(cls, sector_names: List[str]) -> "NewsEffectTable":
+        return cls(np.zeros((1, len(sector_names))), sector_names)
+
+    @classmethod
+    def from_items(cls, news_items: Iterable[dict], sector_names: List[str]) -> "NewsEffectTable":
+        """Sum PercentChange per (Day, Sector) from Day/Sector/PercentChange news items."""
+        index = {name: i for i, name in enumerate(sector_names)}
+        parsed = []
+        for item in news_items:
+            try:
+                parsed.append((int(item.get("Day", 0)), item.get("Sector"), float(item.get("PercentChange", 0))))
+            except Exception as e:
+                print(f"⚠️ Skipping bad news item: {item} ({e})")
+
+        max_day = max((day for day, _, _ in parsed), default=0)
+        effects = np.zeros((max(0, max_day) + 1, len(sector_names)), dtype=np.float64)
+        for day, sector, change in parsed:
+            col = index.get(sector)
+            if day > 0 and col is not None:
+                effects[day, col] += change
+        return cls(np.round(effects, 2), sector_names)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, sector_names: List[str]) -> "NewsEffectTable":
+        """Compile the legacy Day + one-column-per-sector DataFrame."""
+        if df is None or df.empty or "Day" not in df.columns:
+            return cls.empty(sector_names)
+        days = df["Day"].astype(int).to_numpy()
+        effects = np.zeros((max(0, days.max()) + 1, len(sector_names)), dtype=np.float64)
+        for col, name in enumerate(sector_names):
+            if name in df.columns:
+                values = df[name].astype(float).to_numpy()
+                # First row wins for duplicated days, matching the old iloc[0] lookup.
+                for day, value in zip(days[::-1], values[::-1]):
+                    if day >= 0:
+                        effects[day, col] = value
+        return cls(effects, sector_names)
+
+    @classmethod
+    def compile(cls, source, sector_names: List[str]) -> "NewsEffectTable":
+        """Accept a table, a legacy DataFrame, a list of news items or None."""
+        if source is None:
+            return cls.empty(sector_names)
+        if isinstance(source, NewsEffectTable):
+            return source.aligned(sector_names)
+        if isinstance(source, pd.DataFrame):
+            return cls.from_frame(source, sector_names)
+        return cls.from_items(source, sector_names)
+
+    def aligned(self, sector_names: List[str]) -> "NewsEffectTable":
+        if list(sector_names) == self.sector_names:
+            return self
+        index = {name: i for i, name in enumerate(self.sector_names)}
+        effects = np.zeros((len(self.effects), len(sector_names)), dtype=np.float64)
+        for col, name in enumerate(sector_names):
+            if name in index:
+                effects[:, col] = self.effects[:, index[name]]
+        return NewsEffectTable(effects, sector_names)
+
+    def row(self, day: int) -> np.ndarray:
+        if 0 <= day < len(self.effects):
+            return self.effects[day]
+        return self._zeros
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.effects[1:], columns=self.sector_names)
+        df.insert(0, "Day", np.arange(1, len(self.effects)))
+        return df
@@ -0,0 +1,83 @@
+# core/order_flow.py
+
+from typing import Dict, List
+import numpy as np
+
+BUY, SELL = 0, 1
+
+
+class OrderFlowStats:
+    """
+    Per-day, per-sector order-flow accumulator filled while orders are executed.
+    Rows are days (row 0 is day 0), columns are sectors. Keeps the full history
+    so multi-day imbalance queries never have to rescan the transaction log.
+    """
+
+    def __init__(self, sector_names: List[str], capacity_days: int = 64):
+        self.sector_names = list(sector_names)
+        self.sector_index = {name: i for i, name in enumerate(self.sector_names)}
+        shape = (capacity_days, len(self.sector_names))
+        self.counts = np.zeros(shape + (2,), dtype=np.int64)
+        self.volume = np.zeros(shape + (2,), dtype=np.int64)
+        self.notional = np.zeros(shape, dtype=np.float64)
+        self.last_closed_day = None
+
+    def _ensure_day(self, day: int):
+        capacity = self.counts.shape[0]
+        if day < capacity:
+            return
+        new_capacity = max(day + 1, capacity * 2)
+        for attr in ("counts", "volume", "notional"):
+            old = getattr(self, attr)
+            new = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, attr, new)
+
+    def record(self, day: int, sector_idx: int, side: int, price: float, qty: int):
+        self._ensure_day(day)
+        self.counts[day, sector_idx, side] += 1
+        self.volume[day, sector_idx, side] += qty
+        self.notional[day, sector_idx] += price * qty if side == BUY else -price * qty
+
+    def close_day(self, day: int):
+        self._ensure_day(day)
+        self.last_closed_day = day
+
+    def day_counts(self, day: int) -> Dict[str, Dict[str, int]]:
+        """{sector: {"buy": n, "sell": n}} for one day, the herd_memory layout."""
+        self._ensure_day(day)
+        row = self.counts[day]
+        return {
+            name: {"buy": int(row[i, BUY]), "sell": int(row[i, SELL])}
+            for i, name in enumerate(self.sector_names)
+        }
+
+    def last_counts(self, sector_name: str):
+        """(buys, sells) on the most recently closed day, (0, 0) before day one closes."""
+        if self.last_closed_day is None:
+            return 0, 0
+        c = self.counts[self.last_closed_day, self.sector_index[sector_name]]
+        return int(c[BUY]), int(c[SELL])
+
+    def imbalance(self, sector_name: str, days: int = 1, by: str = "count") -> float:
+        """
+        (buy - sell) / (buy + sell) over the last `days` closed days, by trade
+        count or by volume. Returns 0.0 when there was no flow.
+        """
+        if self.last_closed_day is None:
+            return 0.0
+        end = self.last_closed_day + 1
+        start = max(0, end - days)
+        source = self.volume if by == "volume" else self.counts
+        window = source[start:end, self.sector_index[sector_name]].sum(axis=0)
+        total = window[BUY] + window[SELL]
+        if total == 0:
+            return 0.0
+        return float((window[BUY] - window[SELL]) / total)
+
+    def signed_notional(self, sector_name: str, days: int = 1) -> float:
+        if self.last_closed_day is None:
+            return 0.0
+        end = self.last_closed_day + 1
+        start = max(0, end - days)
+        return float(self.notional[start:end, self.sector_index[sector_name]].sum())
@@ -0,0 +1,141 @@
+# core/portfolio_store.py
+
+from collections.abc import MutableMapping
+from typing import List
+import numpy as np
+
+
+def buy_caps(cash, prices, order_qty_max, order_cash_fraction: float, inventory_limit: int) -> np.ndarray:
+    """BaseAgent.can_buy_max over arrays of cash balances and prices (broadcast elementwise)."""
+    afford = np.floor_divide(cash, prices)
+    by_fraction = np.maximum(1, np.floor_divide(cash * order_cash_fraction, prices))
+    qty = np.minimum(np.minimum(order_qty_max, afford), np.minimum(by_fraction, inventory_limit))
+    return np.maximum(0, qty).astype(np.int64)
+
+
+def buy_cap(cash: float, price: float, order_qty_max: int, order_cash_fraction: float, inventory_limit: int) -> int:
+    """buy_caps for a single cash balance and price, in plain Python (cheaper than NumPy scalars)."""
+    afford = int(cash // price)
+    by_fraction = int(max(1, (cash * order_cash_fraction) // price))
+    return max(0, min(order_qty_max, afford, by_fraction, inventory_limit))
+
+
+class HoldingsView(MutableMapping):
+    """
+    Dict-like view over one agent's row of the holdings matrix. It indexes the
+    store on every access, so it stays valid across resizes and pickling.
+    """
+
+    def __init__(self, store: "PortfolioStore", row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, sector_name):
+        return int(self._store.holdings[self._row, self._store.sector_index[sector_name]])
+
+    def __setitem__(self, sector_name, qty):
+        self._store.holdings[self._row, self._store.sector_index[sector_name]] = qty
+
+    def __delitem__(self, sector_name):
+        self[sector_name] = 0
+
+    def get(self, sector_name, default=None):
+        col = self._store.sector_index.get(sector_name)
+        if col is None:
+            return default
+        return int(self._store.holdings[self._row, col])
+
+    def __iter__(self):
+        return iter(self._store.sector_names)
+
+    def __len__(self):
+        return len(self._store.sector_names)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class PortfolioStore:
+    """
+    Struct-of-arrays portfolio state: one cash vector plus an agents x sectors
+    holdings matrix. Agents attached to the store read and write through views,
+    so whole-market valuation and affordability caps (buy_caps) are single NumPy ops.
+    """
+
+    def __init__(self, sector_names: List[str], capacity: int = 0):
+        self.sector_names = list(sector_names)
+        self.sector_index = {name: i for i, name in enumerate(self.sector_names)}
+        self.size = 0
+        self.cash = np.zeros(capacity, dtype=np.float64)
+        self.holdings = np.zeros((capacity, len(self.sector_names)), dtype=np.int64)
+        self.owners = []
+
+    def _grow(self, needed: int):
+        capacity = len(self.cash)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 8)
+        cash = np.zeros(new_capacity, dtype=np.float64)
+        holdings = np.zeros((new_capacity, len(self.sector_names)), dtype=np.int64)
+        cash[:self.size] = self.cash[:self.size]
+        holdings[:self.size] = self.holdings[:self.size]
+        self.cash, self.holdings = cash, holdings
+
+    def allocate(self, n: int, cash: float = 0.0) -> range:
+        """Reserve `n` anonymous rows (used by population-style traders)."""
+        start = self.size
+        self._grow(start + n)
+        self.cash[start:start + n] = cash
+        self.holdings[start:start + n] = 0
+        self.size += n
+        return range(start, start + n)
+
+    def attach(self, agent) -> int:
+        """Move an agent's current cash/holdings into the store and rebind it to views."""
+        cash = agent.cash
+        held = dict(agent.holdings)
+        row = self.size
+        self._grow(row + 1)
+        self.size += 1
+        self.owners.append(agent)
+        self.cash[row] = cash
+        self.holdings[row] = 0
+        for sector_name, qty in held.items():
+            col = self.sector_index.get(sector_name)
+            if col is not None:
+                self.holdings[row, col] = qty
+        agent._bind_portfolio(self, row)
+        return row
+
+    def holdings_view(self, row: int) -> HoldingsView:
+        return HoldingsView(self, row)
+
+    def price_vector(self, market_prices: dict) -> np.ndarray:
+        return np.array([market_prices.get(s, 0.0) for s in self.sector_names], dtype=np.float64)
+
+    def values(self, prices: np.ndarray) -> np.ndarray:
+        """Mark-to-market value of every row: cash + holdings @ prices."""
+        n = self.size
+        return self.cash[:n] + self.holdings[:n] @ prices
+
+    def value_of(self, row: int, prices: np.ndarray) -> float:
+        return float(self.cash[row] + self.holdings[row] @ prices)
+
+    def settle_buy(self, row: int, col: int, qty: int, cost: float, inventory_limit: int) -> bool:
+        """BaseAgent.buy on a row's arrays: pay `cost` for `qty` shares if cash and the inventory limit allow."""
+        cash = float(self.cash[row])
+        held = int(self.holdings[row, col])
+        if qty <= 0 or cash < cost or held + qty > inventory_limit:
+            return False
+        self.cash[row] = cash - cost
+        self.holdings[row, col] = held + qty
+        return True
+
+    def settle_sell(self, row: int, col: int, qty: int, proceeds: float) -> bool:
+        """BaseAgent.sell on a row's arrays."""
+        held = int(self.holdings[row, col])
+        if qty <= 0 or held < qty:
+            return False
+        self.holdings[row, col] = held - qty
+        self.cash[row] += proceeds
+        return True
@@ -0,0 +1,87 @@
+# core/result_cache.py
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from core.result_formats import media_type
+
+
+class Artifact:
+    """One encoded result file: raw bytes, its gzip copy and a strong ETag over the raw bytes."""
+
+    __slots__ = ("raw", "gzip", "etag", "media_type")
+
+    def __init__(self, raw: bytes, media_type: str = "application/json"):
+        self.raw = raw
+        self.gzip = gzip.compress(raw, compresslevel=6, mtime=0)
+        self.etag = '"' + hashlib.blake2b(raw, digest_size=16).hexdigest() + '"'
+        self.media_type = media_type
+
+    @property
+    def size(self) -> int:
+        return len(self.raw) + len(self.gzip)
+
+
+class ResultCache:
+    """
+    Encoded run artifacts held in memory, keyed by (run id, file name).
+    Runs are evicted least-recently-used once the byte budget is exceeded;
+    a finished job can hand its artifacts over directly (put_run) so serving
+    them never touches the disk.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._runs = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _run_size(self, run):
+        return sum(a.size for a in run.values())
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._runs) > 1:
+            _, run = self._runs.popitem(last=False)
+            self._bytes -= self._run_size(run)
+
+    def put(self, run_id: str, name: str, artifact: Artifact) -> Artifact:
+        with self._lock:
+            run = self._runs.setdefault(run_id, {})
+            old = run.get(name)
+            if old is not None:
+                self._bytes -= old.size
+            run[name] = artifact
+            self._bytes += artifact.size
+            self._runs.move_to_end(run_id)
+            self._evict()
+        return artifact
+
+    def put_run(self, run_id: str, artifacts: dict):
+        for name, raw in artifacts.items():
+            self.put(run_id, name, Artifact(raw, media_type(name)))
+
+    def get(self, run_id: str, name: str):
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None or name not in run:
+                return None
+            self._runs.move_to_end(run_id)
+            return run[name]
+
+    def load(self, run_id: str, name: str, path: str):
+        """Cached artifact, else the file's bytes as-is (no parse); None if the file is missing."""
+        artifact = self.get(run_id, name)
+        if artifact is not None:
+            return artifact
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return self.put(run_id, name, Artifact(f.read(), media_type(name)))
+
+    def invalidate(self, run_id: str):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+            if run is not None:
+                self._bytes -= self._run_size(run)
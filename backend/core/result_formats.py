@@ -0,0 +1,102 @@
+# core/result_formats.py
+
+import io
+import os
+import pandas as pd
+
+# File extension -> media type of a saved result table. Each format is saved
+# as-is, so serving it is a byte copy from storage (or the result cache).
+MEDIA_TYPES = {
+    "json": "application/json",
+    "arrows": "application/vnd.apache.arrow.stream",
+}
+FORMAT_ALIASES = {"json": "json", "arrow": "arrows", "arrows": "arrows"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def arrow_available() -> bool:
+    return _pyarrow() is not None
+
+
+def media_type(file_name: str) -> str:
+    return MEDIA_TYPES.get(file_name.rsplit(".", 1)[-1], "application/octet-stream")
+
+
+def negotiate(accept: str = "", fmt: str = None) -> str:
+    """Extension to serve: an explicit ?format= wins, then the Accept header, then JSON."""
+    if fmt:
+        return FORMAT_ALIASES.get(fmt.lower(), "")
+    accept = (accept or "").lower()
+    if MEDIA_TYPES["arrows"] in accept or "application/vnd.apache.arrow" in accept:
+        return "arrows"
+    return "json"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match list names `etag` exactly (or is "*")."""
+    tags = [tag.strip() for tag in (if_none_match or "").split(",")]
+    return "*" in tags or etag in tags
+
+
+def _q(params) -> float:
+    for param in params:
+        name, _, value = param.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether Accept-Encoding allows gzip; "gzip;q=0" (or "*;q=0" without a gzip entry) refuses it."""
+    wildcard = None
+    for entry in (accept_encoding or "").split(","):
+        coding, *params = entry.split(";")
+        coding = coding.strip().lower()
+        if coding in ("gzip", "x-gzip"):
+            return _q(params) > 0
+        if coding == "*":
+            wildcard = _q(params) > 0
+    return bool(wildcard)
+
+
+def dataframe_to_arrow(df, categorical=()):
+    """
+    DataFrame -> pyarrow Table. `categorical` string columns become
+    dictionary-encoded and integer columns are narrowed to the smallest type
+    that holds them (holdings and days rarely need 64 bits).
+    """
+    pa = _pyarrow()
+    df = df.copy(deep=False)
+    for col in categorical:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in df.columns:
+        if pd.api.types.is_integer_dtype(df[col].dtype) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def arrow_stream_bytes(table) -> bytes:
+    pa = _pyarrow()
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def write_bytes(output_dir: str, file_name: str, data: bytes, artifacts: dict = None) -> bytes:
+    with open(os.path.join(output_dir, file_name), "wb") as f:
+        f.write(data)
+    if artifacts is not None:
+        artifacts[file_name] = data
+    return data
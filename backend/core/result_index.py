@@ -0,0 +1,205 @@
+# core/result_index.py
+
+import json
+import os
+import numpy as np
+from core.transaction_store import ACTIONS
+
+INDEX_VERSION = 1
+MAX_PAGE_SIZE = 5000
+
+
+class UnknownValue(KeyError):
+    """A filter value that does not occur in the table (so nothing can match it)."""
+
+
+class UnknownField(ValueError):
+    """A projected field the table does not have."""
+
+
+class IndexedTable:
+    """
+    A saved result table (transactions or agent snapshots) as one .npy file
+    per column plus two indexes, built once when the run is saved:
+
+    - day_offsets[d] .. day_offsets[d + 1] are the rows of day d (rows are in
+      day order, as the engine appends them);
+    - by_agent is a stable agent-sorted permutation of the rows and
+      agent_ranges[a] its slice for agent a, so an agent's rows stay in day order.
+
+    Columns are memory-mapped on load; a query only touches the rows it returns.
+    Categorical columns hold integer codes into `categories[column]`.
+    """
+
+    def __init__(self, root: str, columns: dict, categories: dict, meta: dict):
+        self.root = root
+        self.columns = columns
+        self.categories = categories
+        self.meta = meta
+        self.day_offsets = columns.pop("_day_offsets")
+        self.by_agent = columns.pop("_by_agent")
+        self.agent_ranges = columns.pop("_agent_ranges")
+        self.lookup = {col: {name: i for i, name in enumerate(names)} for col, names in categories.items()}
+
+    @property
+    def fields(self):
+        return list(self.meta["fields"])
+
+    def __len__(self):
+        return int(self.meta["rows"])
+
+    @classmethod
+    def build(cls, root: str, columns: dict, categories: dict, day_column="Day", agent_column="Agent"):
+        """Write `columns` (name -> 1-D array, in day order) and their indexes under `root`."""
+        os.makedirs(root, exist_ok=True)
+        days = np.asarray(columns[day_column], dtype=np.int64)
+        agents = np.asarray(columns[agent_column], dtype=np.int64)
+        n_days = int(days.max()) + 1 if len(days) else 0
+        n_agents = len(categories.get(agent_column, []))
+
+        day_offsets = np.searchsorted(days, np.arange(n_days + 1), side="left").astype(np.int64)
+        by_agent = np.argsort(agents, kind="stable").astype(np.int64)
+        agent_ranges = np.searchsorted(agents[by_agent], np.arange(n_agents + 1), side="left").astype(np.int64)
+
+        arrays = dict(columns)
+        arrays.update({"_day_offsets": day_offsets, "_by_agent": by_agent, "_agent_ranges": agent_ranges})
+        for name, arr in arrays.items():
+            np.save(os.path.join(root, f"{name}.npy"), np.ascontiguousarray(arr))
+        meta = {
+            "version": INDEX_VERSION,
+            "rows": int(len(days)),
+            "fields": list(columns.keys()),
+            "categories": {k: list(v) for k, v in categories.items()},
+            "day_column": day_column,
+            "agent_column": agent_column,
+        }
+        with open(os.path.join(root, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        return cls.load(root)
+
+    @classmethod
+    def load(cls, root: str):
+        meta_path = os.path.join(root, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            return None
+        names = meta["fields"] + ["_day_offsets", "_by_agent", "_agent_ranges"]
+        columns = {name: _load_column(os.path.join(root, f"{name}.npy")) for name in names}
+        return cls(root, columns, meta["categories"], meta)
+
+    def _code(self, column: str, value: str):
+        code = self.lookup.get(column, {}).get(value)
+        if code is None:
+            raise UnknownValue(f"Unknown {column} {value!r}")
+        return code
+
+    def _candidates(self, agent=None, day_from=None, day_to=None):
+        """Row ids for the agent/day filters, in day order, using only the indexes."""
+        n_days = len(self.day_offsets) - 1
+        lo_day = 0 if day_from is None else max(0, int(day_from))
+        hi_day = n_days - 1 if day_to is None else min(n_days - 1, int(day_to))
+        if lo_day > hi_day:
+            return np.empty(0, dtype=np.int64)
+        if agent is None:
+            return np.arange(self.day_offsets[lo_day], self.day_offsets[hi_day + 1], dtype=np.int64)
+
+        code = self._code(self.meta["agent_column"], agent)
+        rows = self.by_agent[self.agent_ranges[code]:self.agent_ranges[code + 1]]
+        if day_from is None and day_to is None:
+            return np.asarray(rows)
+        # The agent's rows are in day order, so the day window is a sub-slice.
+        lo = np.searchsorted(rows, self.day_offsets[lo_day], side="left")
+        hi = np.searchsorted(rows, self.day_offsets[hi_day + 1], side="left")
+        return np.asarray(rows[lo:hi])
+
+    def query(self, agent=None, day_from=None, day_to=None, where=None, fields=None,
+              cursor: int = 0, limit: int = 500):
+        """
+        Filtered, projected page of rows. `where` maps further categorical
+        columns to a required value. Returns (records, next_cursor); the
+        cursor is a position in the agent/day candidate list, so paging
+        costs O(page), not O(table).
+        """
+        if fields:
+            unknown = [f for f in fields if f not in self.meta["fields"]]
+            if unknown:
+                raise UnknownField(f"Unknown field(s) {', '.join(unknown)}; expected {', '.join(self.fields)}")
+        else:
+            fields = self.fields
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        candidates = self._candidates(agent, day_from, day_to)
+        conditions = [(self.columns[col], self._code(col, value)) for col, value in (where or {}).items()]
+
+        picked, count = [], 0
+        pos = max(0, int(cursor))
+        # Scan in blocks so a selective filter still stops as soon as the page is full.
+        block = max(limit, 256)
+        while pos < len(candidates) and count < limit:
+            rows = candidates[pos:pos + block]
+            mask = np.ones(len(rows), dtype=bool)
+            for column, code in conditions:
+                mask &= np.asarray(column[rows]) == code
+            hits = np.flatnonzero(mask)
+            need = limit - count
+            if len(hits) >= need:
+                hits = hits[:need]
+                picked.append(rows[hits])
+                count += need
+                pos += int(hits[-1]) + 1
+                break
+            picked.append(rows[hits])
+            count += len(hits)
+            pos += len(rows)
+        rows = np.concatenate(picked) if picked else np.empty(0, dtype=np.int64)
+
+        data = {}
+        for col in fields:
+            values = np.asarray(self.columns[col][rows])
+            names = self.categories.get(col)
+            data[col] = [names[v] for v in values.tolist()] if names is not None else values.tolist()
+        records = [dict(zip(fields, values)) for values in zip(*(data[col] for col in fields))]
+        next_cursor = pos if pos < len(candidates) else None
+        return records, next_cursor
+
+
+def _load_column(path: str):
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        # Empty arrays cannot be memory-mapped.
+        return np.load(path)
+
+
+def _codes(values, names):
+    index = {name: i for i, name in enumerate(names)}
+    return np.array([index[v] for v in values], dtype=np.int32)
+
+
+def build_transaction_index(root: str, log):
+    """Index a TransactionLog's columns under `root`."""
+    cols = log.columns()
+    return IndexedTable.build(root, {
+        "Agent": cols["agent"],
+        "Day": cols["day"],
+        "Sector": cols["sector"],
+        "Action": cols["side"],
+        "Price": cols["price"],
+        "Qty": cols["qty"],
+    }, {"Agent": list(log.agent_names), "Sector": list(log.sector_names), "Action": list(ACTIONS)})
+
+
+def build_snapshot_index(root: str, snapshots, sector_names):
+    """Index engine.agent_snapshots (list of per-agent, per-day dicts) under `root`."""
+    agent_names = list(dict.fromkeys(s["Agent"] for s in snapshots))
+    columns = {
+        "Day": np.array([s["Day"] for s in snapshots], dtype=np.int32),
+        "Agent": _codes([s["Agent"] for s in snapshots], agent_names),
+        "TotalValue": np.array([s.get("TotalValue", 0.0) for s in snapshots], dtype=np.float64),
+        "Cash": np.array([s.get("Cash", 0.0) for s in snapshots], dtype=np.float64),
+    }
+    for name in sector_names:
+        columns[name] = np.array([s.get(name, 0) for s in snapshots], dtype=np.int64)
+    return IndexedTable.build(root, columns, {"Agent": agent_names})
@@ -1,10 +1,11 @@
 import random
+from core.timeseries import PriceHistory
 
 class Sector:
-    def __init__(self, name: str, base_price: float):
+    def __init__(self, name: str, base_price: float, history_capacity: int = 256, keep_full_history: bool = True):
         self.name = name
         self.price = base_price
-        self.history = [base_price]
+        self.history = PriceHistory([base_price], capacity=history_capacity, keep_full=keep_full_history)
 
     def update_price(self, demand_factor: float):
 
@@ -0,0 +1,285 @@
+# core/timeseries.py
+
+import math
+from typing import Iterable
+import numpy as np
+
+LOG_EPS = 1e-9
+RESYNC_EVERY = 1024
+
+
+# Module-level so indicator state stays picklable (engine snapshots, process pools).
+def _identity(x):
+    return x
+
+
+def _square(x):
+    return x * x
+
+
+def _gain(d):
+    return d if d > 0 else 0.0
+
+
+def _loss(d):
+    return -d if d < 0 else 0.0
+
+
+class _RollingSum:
+    """Running sum of f(source[t]) over the last `window` valid entries of a ring."""
+
+    def __init__(self, history, source: str, window: int, fn=None):
+        self.history = history
+        self.source = source
+        self.window = window
+        self.fn = fn or _identity
+        # Returns-like series have no value at t=0.
+        self.start = 0 if source == "price" else 1
+        self.resync()
+
+    def _value(self, t):
+        return self.fn(self.history._rings[self.source][t % self.history.capacity])
+
+    def resync(self):
+        n = self.history._n
+        lo = max(self.start, n - self.window)
+        self.sum = sum(self._value(t) for t in range(lo, n))
+
+    def count(self):
+        return max(0, min(self.window, self.history._n - self.start))
+
+    def push(self, t):
+        if t < self.start:
+            return
+        self.sum += self._value(t)
+        leaving = t - self.window
+        if leaving >= self.start:
+            self.sum -= self._value(leaving)
+
+    def replace_last(self, t, old):
+        if t >= self.start:
+            self.sum += self._value(t) - self.fn(old[self.source])
+
+    def mean(self):
+        k = self.count()
+        return self.sum / k if k else 0.0
+
+
+class _Ewma:
+    def __init__(self, history, span: int):
+        self.history = history
+        self.alpha = 2.0 / (span + 1.0)
+        self.before = None
+        self.value = None
+        for p in history.window(history.capacity):
+            self.push_price(float(p))
+
+    def push_price(self, p):
+        self.before = self.value
+        self.value = p if self.before is None else self.alpha * p + (1 - self.alpha) * self.before
+
+    def replace_price(self, p):
+        self.value = p if self.before is None else self.alpha * p + (1 - self.alpha) * self.before
+
+
+class PriceHistory:
+    """
+    Sector price series backed by a preallocated NumPy ring buffer, with an
+    optional spill of the full history. Behaves like the old list for len(),
+    indexing, slicing, iteration, append() and `history[-1] = x`.
+
+    Rolling indicators (SMA, mean/std of simple and log returns, RSI, EWMA) are
+    registered on first request and then updated in O(1) per price change,
+    including in-place corrections of the last price.
+    """
+
+    def __init__(self, prices: Iterable[float] = (), capacity: int = 256, keep_full: bool = True):
+        self.capacity = capacity
+        self.keep_full = keep_full
+        self._n = 0
+        self._rings = {
+            "price": np.zeros(capacity, dtype=np.float64),
+            "ret": np.zeros(capacity, dtype=np.float64),
+            "logret": np.zeros(capacity, dtype=np.float64),
+            "delta": np.zeros(capacity, dtype=np.float64),
+        }
+        self._full = np.empty(64, dtype=np.float64) if keep_full else None
+        self._sums = {}
+        self._ewmas = {}
+        self._updates = 0
+        self.first = None
+        for p in prices:
+            self.append(p)
+
+    # ------------------------------------------------------------------ writes
+
+    def _write_derived(self, t):
+        cap = self.capacity
+        if t == 0:
+            for name in ("ret", "logret", "delta"):
+                self._rings[name][0] = 0.0
+            return
+        p = self._rings["price"][t % cap]
+        prev = self._rings["price"][(t - 1) % cap]
+        self._rings["ret"][t % cap] = (p - prev) / prev if prev != 0 else 0.0
+        self._rings["logret"][t % cap] = math.log(p + LOG_EPS) - math.log(prev + LOG_EPS)
+        self._rings["delta"][t % cap] = p - prev
+
+    def _tick(self):
+        self._updates += 1
+        if self._updates % RESYNC_EVERY == 0:
+            for acc in self._sums.values():
+                acc.resync()
+
+    def append(self, price: float):
+        price = float(price)
+        t = self._n
+        if t == 0:
+            self.first = price
+        self._rings["price"][t % self.capacity] = price
+        if self.keep_full:
+            if t == len(self._full):
+                grown = np.empty(2 * len(self._full), dtype=np.float64)
+                grown[:t] = self._full
+                self._full = grown
+            self._full[t] = price
+        self._n = t + 1
+        self._write_derived(t)
+        for acc in self._sums.values():
+            acc.push(t)
+        for ewma in self._ewmas.values():
+            ewma.push_price(price)
+        self._tick()
+
+    def replace_last(self, price: float):
+        price = float(price)
+        t = self._n - 1
+        if t < 0:
+            raise IndexError("replace_last on empty history")
+        slot = t % self.capacity
+        old = {name: ring[slot] for name, ring in self._rings.items()}
+        self._rings["price"][slot] = price
+        if self.keep_full:
+            self._full[t] = price
+        if t == 0:
+            self.first = price
+        self._write_derived(t)
+        for acc in self._sums.values():
+            acc.replace_last(t, old)
+        for ewma in self._ewmas.values():
+            ewma.replace_price(price)
+        self._tick()
+
+    def __setitem__(self, idx, price):
+        if idx < 0:
+            idx += self._n
+        if idx != self._n - 1:
+            raise IndexError("only the most recent price can be corrected in place")
+        self.replace_last(price)
+
+    # ------------------------------------------------------------------- reads
+
+    def __len__(self):
+        return self._n
+
+    def _oldest_available(self):
+        return 0 if self.keep_full else max(0, self._n - self.capacity)
+
+    def _at(self, t):
+        if self.keep_full:
+            return self._full[t]
+        return self._rings["price"][t % self.capacity]
+
+    def __getitem__(self, idx):
+        n = self._n
+        if isinstance(idx, slice):
+            if self.keep_full:
+                return self._full[:n][idx].copy()
+            positions = range(*idx.indices(n))
+            if len(positions) and min(positions) < self._oldest_available():
+                raise IndexError("slice reaches past the ring buffer; use keep_full=True")
+            return np.array([self._rings["price"][t % self.capacity] for t in positions])
+        if idx < 0:
+            idx += n
+        if not self._oldest_available() <= idx < n:
+            raise IndexError("price history index out of range")
+        return float(self._at(idx))
+
+    def __iter__(self):
+        for t in range(self._oldest_available(), self._n):
+            yield float(self._at(t))
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.to_numpy()
+        return arr.astype(dtype) if dtype is not None else arr
+
+    def __repr__(self):
+        return f"PriceHistory(n={self._n}, last={self[-1] if self._n else None})"
+
+    def to_numpy(self) -> np.ndarray:
+        if self.keep_full:
+            return self._full[:self._n].copy()
+        return self.window(self.capacity)
+
+    def tolist(self):
+        return self.to_numpy().tolist()
+
+    def window(self, k: int) -> np.ndarray:
+        """Last k prices (fewer if not available), oldest first."""
+        k = min(k, self._n, self.capacity)
+        return np.array([self._rings["price"][t % self.capacity] for t in range(self._n - k, self._n)])
+
+    def returns(self, k: int, pad: bool = True) -> np.ndarray:
+        """Last k simple returns, oldest first; left-padded with zeros when history is short."""
+        avail = min(k, max(0, self._n - 1), self.capacity - 1)
+        out = np.array([self._rings["ret"][t % self.capacity] for t in range(self._n - avail, self._n)])
+        if pad and avail < k:
+            out = np.concatenate([np.zeros(k - avail), out])
+        return out
+
+    # -------------------------------------------------------------- indicators
+
+    def _sum(self, source, window, fn=None, key=None):
+        key = key or (source, window)
+        acc = self._sums.get(key)
+        if acc is None:
+            if window >= self.capacity:
+                raise ValueError(f"window {window} does not fit ring capacity {self.capacity}")
+            acc = self._sums[key] = _RollingSum(self, source, window, fn)
+        return acc
+
+    def sma(self, window: int) -> float:
+        return self._sum("price", window).mean()
+
+    def mean_return(self, window: int) -> float:
+        return self._sum("ret", window).mean()
+
+    def return_std(self, window: int) -> float:
+        """Population std (np.std) of the last `window` simple returns."""
+        return self._std("ret", window)
+
+    def log_return_std(self, window: int) -> float:
+        """Realized volatility: population std of the last `window` log returns."""
+        return self._std("logret", window)
+
+    def _std(self, source, window):
+        s1 = self._sum(source, window)
+        s2 = self._sum(source, window, fn=_square, key=(source + "^2", window))
+        k = s1.count()
+        if k == 0:
+            return 0.0
+        mean = s1.sum / k
+        return math.sqrt(max(0.0, s2.sum / k - mean * mean))
+
+    def rsi(self, window: int) -> float:
+        gains = self._sum("delta", window, fn=_gain, key=("gain", window)).sum
+        losses = self._sum("delta", window, fn=_loss, key=("loss", window)).sum
+        if losses <= 0:
+            return 100.0 if gains > 0 else 50.0
+        return 100.0 - 100.0 / (1.0 + gains / losses)
+
+    def ewma(self, span: int) -> float:
+        ewma = self._ewmas.get(span)
+        if ewma is None:
+            ewma = self._ewmas[span] = _Ewma(self, span)
+        return ewma.value if ewma.value is not None else 0.0
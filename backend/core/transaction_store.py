@@ -0,0 +1,179 @@
+# core/transaction_store.py
+
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+ACTIONS = ["BUY", "SELL"]
+COLUMNS = ["Agent", "Day", "Sector", "Action", "Price", "Qty"]
+
+_DTYPES = {
+    "day": np.int32,
+    "agent": np.int32,
+    "sector": np.int32,
+    "side": np.int8,
+    "price": np.float64,
+    "qty": np.int64,
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("pyarrow is required for Arrow/Parquet export (pip install pyarrow)") from e
+    return pyarrow
+
+
+class TransactionLog:
+    """
+    Append-only columnar fill log. Rows live in fixed-size typed NumPy chunks;
+    agent and sector names are interned to integer ids. Behaves like the old
+    list of dicts for reads and append(), but exports as columns.
+    """
+
+    def __init__(self, sector_names: List[str] = (), chunk_size: int = 8192):
+        self.chunk_size = chunk_size
+        self.agent_names: List[str] = []
+        self.sector_names: List[str] = []
+        self._agent_ids: Dict[str, int] = {}
+        self._sector_ids: Dict[str, int] = {}
+        for name in sector_names:
+            self.sector_id(name)
+        self._sealed: List[Dict[str, np.ndarray]] = []
+        self._open = self._new_chunk()
+        self._fill = 0
+
+    def _new_chunk(self):
+        return {col: np.empty(self.chunk_size, dtype=dt) for col, dt in _DTYPES.items()}
+
+    def agent_id(self, name: str) -> int:
+        idx = self._agent_ids.get(name)
+        if idx is None:
+            idx = self._agent_ids[name] = len(self.agent_names)
+            self.agent_names.append(name)
+        return idx
+
+    def sector_id(self, name: str) -> int:
+        idx = self._sector_ids.get(name)
+        if idx is None:
+            idx = self._sector_ids[name] = len(self.sector_names)
+            self.sector_names.append(name)
+        return idx
+
+    def record(self, day: int, agent_id: int, sector_id: int, side: int, price: float, qty: int):
+        chunk, i = self._open, self._fill
+        chunk["day"][i] = day
+        chunk["agent"][i] = agent_id
+        chunk["sector"][i] = sector_id
+        chunk["side"][i] = side
+        chunk["price"][i] = price
+        chunk["qty"][i] = qty
+        self._fill = i + 1
+        if self._fill == self.chunk_size:
+            self._sealed.append(chunk)
+            self._open = self._new_chunk()
+            self._fill = 0
+
+    def append(self, txn: dict):
+        """List-style append of a {"Agent", "Day", "Sector", "Action", "Price", "Qty"} dict."""
+        self.record(
+            txn["Day"],
+            self.agent_id(txn["Agent"]),
+            self.sector_id(txn["Sector"]),
+            ACTIONS.index(txn["Action"]),
+            txn["Price"],
+            txn["Qty"],
+        )
+
+    def __len__(self):
+        return len(self._sealed) * self.chunk_size + self._fill
+
+    def _row(self, idx: int) -> dict:
+        chunk_no, i = divmod(idx, self.chunk_size)
+        chunk = self._sealed[chunk_no] if chunk_no < len(self._sealed) else self._open
+        return {
+            "Agent": self.agent_names[chunk["agent"][i]],
+            "Day": int(chunk["day"][i]),
+            "Sector": self.sector_names[chunk["sector"][i]],
+            "Action": ACTIONS[chunk["side"][i]],
+            "Price": float(chunk["price"][i]),
+            "Qty": int(chunk["qty"][i]),
+        }
+
+    def __getitem__(self, idx):
+        n = len(self)
+        if isinstance(idx, slice):
+            return [self._row(i) for i in range(*idx.indices(n))]
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError("transaction index out of range")
+        return self._row(idx)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Raw id-encoded columns. A single chunk is returned as views, not copies."""
+        parts = self._sealed + [{col: arr[:self._fill] for col, arr in self._open.items()}]
+        if len(parts) == 1:
+            return parts[0]
+        return {col: np.concatenate([p[col] for p in parts]) for col in _DTYPES}
+
+    def columns_between(self, start: int, stop: int = None) -> Dict[str, np.ndarray]:
+        """Id-encoded columns for rows [start, stop), touching only the chunks they span."""
+        n = len(self)
+        stop = n if stop is None else min(stop, n)
+        start = max(0, min(start, stop))
+        parts = []
+        for chunk_no in range(start // self.chunk_size, (stop - 1) // self.chunk_size + 1 if stop > start else 0):
+            chunk = self._sealed[chunk_no] if chunk_no < len(self._sealed) else self._open
+            base = chunk_no * self.chunk_size
+            lo, hi = max(start, base) - base, min(stop, base + self.chunk_size) - base
+            parts.append({col: arr[lo:hi] for col, arr in chunk.items()})
+        if not parts:
+            return {col: np.empty(0, dtype=dt) for col, dt in _DTYPES.items()}
+        if len(parts) == 1:
+            return parts[0]
+        return {col: np.concatenate([p[col] for p in parts]) for col in _DTYPES}
+
+    def to_pandas(self) -> pd.DataFrame:
+        cols = self.columns()
+        return pd.DataFrame({
+            "Agent": pd.Categorical.from_codes(cols["agent"], categories=self.agent_names or [""]),
+            "Day": cols["day"],
+            "Sector": pd.Categorical.from_codes(cols["sector"], categories=self.sector_names or [""]),
+            "Action": pd.Categorical.from_codes(cols["side"], categories=ACTIONS),
+            "Price": cols["price"],
+            "Qty": cols["qty"],
+        }, copy=False)
+
+    def to_arrow(self):
+        pa = _require_pyarrow()
+        cols = self.columns()
+
+        def dictionary(codes, names):
+            return pa.DictionaryArray.from_arrays(pa.array(codes), pa.array(names, type=pa.string()))
+
+        return pa.table({
+            "Agent": dictionary(cols["agent"], self.agent_names),
+            "Day": pa.array(cols["day"]),
+            "Sector": dictionary(cols["sector"], self.sector_names),
+            "Action": dictionary(cols["side"], ACTIONS),
+            "Price": pa.array(cols["price"]),
+            "Qty": pa.array(cols["qty"]),
+        })
+
+    def write_parquet(self, path: str):
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path)
+
+    def write_arrow(self, path: str):
+        pa = _require_pyarrow()
+        table = self.to_arrow()
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
@@ -3,9 +3,11 @@
 import os
 import json
 import re
-import google.generativeai as genai
 from utils.config import SECTORS
 
+# Bump whenever PROMPT_TEMPLATE changes meaningfully, so cached news stops matching.
+PROMPT_VERSION = 1
+
 PROMPT_TEMPLATE = """
 You are a sophisticated financial news generator specializing in sequential, plausible market narratives.
 Generate a realistic {num_days}-day sequence of news headlines, starting from Day 1.
@@ -29,16 +31,18 @@ Generate a realistic {num_days}-day sequence of news headlines, starting from Da
 Output a single, continuous JSON list of objects.
 """
 
-def generate_market_news(numDays):
+def request_gemini_news(numDays, sectors=None):
+    """One gemini-2.5-pro call for a numDays narrative over `sectors` (name -> base value)."""
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         raise EnvironmentError("❌ Missing GEMINI_API_KEY in environment or .env")
+    import google.generativeai as genai
 
     genai.configure(api_key=api_key)
     model = genai.GenerativeModel("gemini-2.5-pro")
 
     prompt = PROMPT_TEMPLATE.format(
-        sectors=", ".join([f"{k} {v}" for k, v in SECTORS.items()]),
+        sectors=", ".join([f"{k} {v}" for k, v in (sectors or SECTORS).items()]),
         num_days=numDays  
     )
 
@@ -54,10 +58,14 @@ def generate_market_news(numDays):
         else:
             print("⚠️ Failed to extract JSON from Gemini response.")
             data = []
+    return data
+
 
-    os.makedirs("output", exist_ok=True)
-    with open("output/news.json", "w") as f:
+def generate_market_news(numDays, output_path="output/news.json"):
+    data = request_gemini_news(numDays)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w") as f:
         json.dump(data, f, indent=2)
 
-    print(f"📰 Generated {len(data)} news items → output/news.json")
+    print(f"📰 Generated {len(data)} news items → {output_path}")
     return data
\ No newline at end of file
@@ -0,0 +1,249 @@
+# llm/news_providers.py
+
+import hashlib
+import json
+import os
+import random
+import time
+from llm.news_generator import PROMPT_VERSION, request_gemini_news
+
+# Bump when the local generator's output changes for the same seed.
+LOCAL_GENERATOR_VERSION = 1
+
+NEUTRAL_BAND = 0.3
+NEWS_FIELDS = ("Day", "Sector", "Sentiment", "PercentChange")
+
+
+def _digest(payload) -> str:
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class GeminiNewsProvider:
+    """The LLM narrative: one gemini-2.5-pro call per generate()."""
+
+    name = "gemini"
+    version = PROMPT_VERSION
+    seeded = False
+
+    def available(self) -> bool:
+        if not os.getenv("GEMINI_API_KEY"):
+            return False
+        try:
+            import google.generativeai  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def generate(self, num_days: int, sectors: dict) -> list:
+        return request_gemini_news(num_days, sectors)
+
+
+# (regime, direction) -> headline templates. {prev} is the sector's last reported move.
+HEADLINES = {
+    ("continuation", 1): [
+        "{sector} Extends Rally After {prev:+.1f}% Move",
+        "Buyers Return to {sector} as Momentum Builds",
+        "{sector} Upgrades Keep Coming After Strong Session",
+    ],
+    ("continuation", -1): [
+        "{sector} Slide Deepens Following {prev:+.1f}% Drop",
+        "Selling Pressure Persists Across {sector}",
+        "{sector} Downgrades Pile Up as Weakness Continues",
+    ],
+    ("consolidation", 1): [
+        "{sector} Steadies After Recent Swings",
+        "{sector} Edges Higher in Quiet Trade",
+    ],
+    ("consolidation", -1): [
+        "{sector} Drifts Lower as Traders Take a Breather",
+        "{sector} Trades Flat Ahead of Fresh Data",
+    ],
+    ("reversal", 1): [
+        "{sector} Rebounds as Bargain Hunters Step In",
+        "Short Covering Lifts {sector} Off Its Lows",
+    ],
+    ("reversal", -1): [
+        "{sector} Gives Back Gains on Profit Taking",
+        "{sector} Reverses Lower After {prev:+.1f}% Run",
+    ],
+    ("shock", 1): [
+        "Surprise Policy Boost Sends {sector} Sharply Higher",
+        "Blockbuster Earnings Beat Lifts {sector}",
+    ],
+    ("shock", -1): [
+        "Regulatory Probe Hits {sector}",
+        "Supply Shock Sends {sector} Tumbling",
+    ],
+}
+
+
+class LocalNewsProvider:
+    """
+    Offline stand-in for the LLM: a seeded stochastic narrative in the same
+    Day/Sector/Headline/Sentiment/PercentChange schema. Each sector carries a
+    trend; every story on it continues the trend (most likely), consolidates
+    or reverses it, with rare larger shocks, mirroring the rules the prompt
+    asks the LLM to follow. The same seed always yields the same news.
+    """
+
+    name = "local"
+    version = LOCAL_GENERATOR_VERSION
+    seeded = True
+
+    # Stories per day: 0..5, mostly one to three.
+    ITEMS_PER_DAY = (0, 1, 2, 3, 4, 5)
+    ITEM_WEIGHTS = (0.10, 0.25, 0.30, 0.20, 0.10, 0.05)
+    REGIMES = ("continuation", "consolidation", "reversal")
+    REGIME_WEIGHTS = (0.55, 0.30, 0.15)
+    P_SHOCK = 0.03
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+
+    def available(self) -> bool:
+        return True
+
+    def _move(self, rng, regime, trend):
+        if regime == "continuation":
+            return trend * rng.uniform(0.5, 3.0)
+        if regime == "reversal":
+            return -trend * rng.uniform(1.0, 4.0)
+        if regime == "shock":
+            return rng.choice((-1, 1)) * rng.uniform(5.0, 12.0)
+        return rng.uniform(-0.9, 0.9)
+
+    def generate(self, num_days: int, sectors: dict) -> list:
+        rng = random.Random(self.seed)
+        names = sorted(sectors)
+        if not names:
+            return []
+        trend = {name: rng.choice((-1, 1)) for name in names}
+        last = {name: None for name in names}
+
+        items = []
+        for day in range(1, int(num_days) + 1):
+            count = rng.choices(self.ITEMS_PER_DAY, weights=self.ITEM_WEIGHTS)[0]
+            for sector in rng.sample(names, min(count, len(names))):
+                if rng.random() < self.P_SHOCK:
+                    regime = "shock"
+                else:
+                    regime = rng.choices(self.REGIMES, weights=self.REGIME_WEIGHTS)[0]
+                change = round(self._move(rng, regime, trend[sector]), 2)
+                direction = 1 if change >= 0 else -1
+                if regime != "consolidation":
+                    trend[sector] = direction
+                templates = HEADLINES[(regime, direction)]
+                if last[sector] is None:
+                    templates = [t for t in templates if "{prev" not in t]
+                headline = rng.choice(templates)
+                if change > NEUTRAL_BAND:
+                    sentiment = "positive"
+                elif change < -NEUTRAL_BAND:
+                    sentiment = "negative"
+                else:
+                    sentiment = "neutral"
+                items.append({
+                    "Day": day,
+                    "Sector": sector,
+                    "Headline": headline.format(sector=sector, prev=last[sector]),
+                    "Sentiment": sentiment,
+                    "PercentChange": change,
+                })
+                last[sector] = change
+        return items
+
+
+PROVIDERS = {"gemini": GeminiNewsProvider, "local": LocalNewsProvider}
+
+
+def usable_items(items) -> list:
+    """The items of a provider result that follow the news schema; [] for anything unusable."""
+    if not isinstance(items, list):
+        return []
+    return [item for item in items if isinstance(item, dict) and all(k in item for k in NEWS_FIELDS)]
+
+
+def news_key(provider, num_days: int, sectors: dict, seed=None) -> str:
+    """Hash of everything that determines a provider's news for a run."""
+    return _digest({
+        "provider": provider.name,
+        "version": provider.version,
+        "num_days": int(num_days),
+        "sectors": sorted(dict(sectors).items()),
+        "seed": seed if provider.seeded else None,
+    })
+
+
+class NewsCache:
+    """
+    Generated news on disk, one JSON file per news key. A run with the same
+    days, sectors and prompt version reuses earlier LLM output instead of
+    calling the API again, including with no network or API key.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return json.load(f)["items"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Ignoring unreadable news cache entry {path}: {e}")
+            return None
+
+    def put(self, key: str, items: list, meta=None):
+        entry = {"key": key, "created": time.time(), "meta": meta or {}, "items": items}
+        path = self._path(key)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        return entry
+
+
+def get_market_news(num_days: int, sectors: dict, provider: str = "auto", seed=None, cache: NewsCache = None):
+    """
+    News items for a run. `provider` is "gemini", "local" or "auto": cached
+    Gemini news if there is any, else a live Gemini call when a key is set,
+    else (or if that call fails or yields no usable items) the seeded local
+    generator. An explicitly requested provider raises instead of falling back.
+    """
+    if provider not in ("auto", *PROVIDERS):
+        raise ValueError(f"Unknown news provider {provider!r}; expected auto, {', '.join(PROVIDERS)}")
+    seed = 0 if seed is None else seed
+    names = ("gemini", "local") if provider == "auto" else (provider,)
+    candidates = [LocalNewsProvider(seed) if name == "local" else PROVIDERS[name]() for name in names]
+
+    for source in candidates:
+        key = news_key(source, num_days, sectors, seed)
+        # Local news is cheap to regenerate and deterministic, so only LLM output is cached.
+        if cache is not None and not source.seeded:
+            items = usable_items(cache.get(key))
+            if items:
+                print(f"📰 Reusing cached {source.name} news {key[:12]} ({len(items)} items)")
+                return items
+        if provider == "auto" and not source.available():
+            continue
+        try:
+            items = usable_items(source.generate(num_days, sectors))
+            if not items:
+                raise ValueError("no usable news items in the response")
+        except Exception as e:
+            if provider != "auto":
+                raise
+            print(f"⚠️ {source.name} news generation failed ({e}); falling back to local news")
+            continue
+        if cache is not None and not source.seeded and items:
+            cache.put(key, items, meta={"provider": source.name, "num_days": num_days})
+        print(f"📰 Generated {len(items)} {source.name} news items")
+        return items
+    return []
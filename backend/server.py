@@ -1,25 +1,40 @@
 # server.py 
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, List
+from typing import Dict, List, Optional
+from collections import OrderedDict
 import os
 import json
+import time
+import asyncio
+import threading
 import pandas as pd
 import numpy as np
 
 from core.market_engine import MarketEngine
-from core.ga_evolver import evolve
-import utils.config as config_module
+from core.ga_evolver import evolve, default_workers, evolution_hyperparams, PARAM_SPACE
+from core.genome_cache import GenomeCache, evolution_key
+from core.jobs import JobManager, JobCancelled, TERMINAL_STATES
+from core.market_config import MarketConfig
+from core.day_stream import DayStreamWriter, read_records
+from core.result_cache import ResultCache
+from core.result_formats import (
+    MEDIA_TYPES, accepts_gzip, arrow_available, arrow_stream_bytes, dataframe_to_arrow, etag_matches, negotiate,
+    write_bytes
+)
+from core.result_index import (
+    IndexedTable, UnknownField, UnknownValue, build_transaction_index, build_snapshot_index
+)
 from utils.config import (
     SECTORS, 
     NUM_DAYS
 ) 
-from llm.news_generator import generate_market_news
+from llm.news_providers import NewsCache, get_market_news
 from core.news_injector import simulate_from_news
-from visuals.plotter import plot_price_histories, plot_agent_performance
+from visuals.plotter import render_price_histories, render_agent_performance
 
 from agents.random_agent import RandomAgent
 from agents.momentum_agent import MomentumAgent
@@ -77,23 +92,78 @@ app.add_middleware(
 
 OUTPUT_DIR = "output"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-SIMULATION_STATUS = {"status": "IDLE", "day": 0, "total_days": NUM_DAYS} 
-
-def save_dataframe_as_json(df: pd.DataFrame, file_name_base: str):
-    file_path = os.path.join(OUTPUT_DIR, f"{file_name_base}.json")
-    df.to_json(file_path, orient="records", indent=2)
-
-def _read_json_data(file_name_base: str):
-    file_path = os.path.join(OUTPUT_DIR, f"{file_name_base}.json")
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail=f"{file_name_base}.json not found. Run simulation first.")
+GENOME_CACHE = GenomeCache(os.path.join(OUTPUT_DIR, "genome_cache"))
+NEWS_CACHE = NewsCache(os.path.join(OUTPUT_DIR, "news_cache"))
+# Full-length evaluations on the worker pool. Racing is left off: pooled rungs re-run survivors
+# from the snapshot, so at this size it costs about as many simulated days as it saves.
+GA_SETTINGS = {"pop_size": 20, "generations": 8, "eval_days": 15, "warmup_days": 10}
+
+IDLE_STATUS = {"status": "IDLE", "day": 0, "total_days": NUM_DAYS}
+# Each run is a job with its own directory under output/jobs/<id>; at most
+# SIM_WORKERS simulations run at once, the rest wait in the queue.
+SIM_WORKERS = int(os.getenv("SIM_WORKERS", "2"))
+# Encoded results per run; a job finishing in this server is cached straight from its worker.
+RESULT_CACHE = ResultCache(max_bytes=int(os.getenv("RESULT_CACHE_MB", "256")) * 1024 * 1024)
+JOBS = JobManager(OUTPUT_DIR, max_workers=SIM_WORKERS, on_result=RESULT_CACHE.put_run)
+# Per-day results feed each job appends to while it simulates (see core/day_stream.py).
+DAY_STREAM_FILE = "days.jsonl"
+
+def save_dataframe_as_json(df: pd.DataFrame, file_name_base: str, output_dir: str = OUTPUT_DIR, artifacts: dict = None):
+    data = df.to_json(orient="records").encode("utf-8")
+    return write_bytes(output_dir, f"{file_name_base}.json", data, artifacts)
+
+def save_table(df: pd.DataFrame, file_name_base: str, output_dir: str = OUTPUT_DIR, artifacts: dict = None,
+               arrow_table=None, categorical=()):
+    """Save a result table once per served format: compact JSON records and an Arrow IPC stream."""
+    save_dataframe_as_json(df, file_name_base, output_dir, artifacts)
+    if arrow_available():
+        table = arrow_table if arrow_table is not None else dataframe_to_arrow(df, categorical)
+        write_bytes(output_dir, f"{file_name_base}.arrows", arrow_stream_bytes(table), artifacts)
+
+def save_json(obj, file_name_base: str, output_dir: str = OUTPUT_DIR, artifacts: dict = None):
+    data = json.dumps(obj, indent=2).encode("utf-8")
+    return write_bytes(output_dir, f"{file_name_base}.json", data, artifacts)
+
+def _resolve_run(job_id: str = None):
+    """(run id, output directory) of `job_id`, or of the latest completed job (legacy output/ before any)."""
+    if job_id is None:
+        job_id = JOBS.latest(completed=True)
+        if job_id is None:
+            return "legacy", OUTPUT_DIR
+    elif not JOBS.exists(job_id):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job_id, JOBS.context(job_id).output_dir
+
+def _load_artifact(run_id: str, output_dir: str, file_name: str):
+    file_path = os.path.join(output_dir, file_name)
+    if run_id == "legacy" and os.path.exists(file_path):
+        # Files in output/ can be rewritten in place; key them by mtime so a rewrite misses the cache.
+        run_id = f"legacy@{os.path.getmtime(file_path)}"
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return JSONResponse(content=data)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading {file_name_base}.json: {e}")
+        return RESULT_CACHE.load(run_id, file_name, file_path)
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Error reading {file_name}: {e}")
+
+def _read_json_data(file_name_base: str, request: Request = None, job_id: str = None):
+    """Serve a saved result in the format the client negotiated (?format= or Accept), JSON by default."""
+    ext = "json"
+    if request is not None:
+        ext = negotiate(request.headers.get("accept", ""), request.query_params.get("format"))
+        if ext not in MEDIA_TYPES:
+            raise HTTPException(status_code=406, detail=f"Supported formats: {', '.join(MEDIA_TYPES)}.")
+    file_name = f"{file_name_base}.{ext}"
+    run_id, output_dir = _resolve_run(job_id)
+    artifact = _load_artifact(run_id, output_dir, file_name)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail=f"{file_name} not found. Run simulation first.")
+
+    headers = {"ETag": artifact.etag, "Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding"}
+    if request is not None and etag_matches(request.headers.get("if-none-match", ""), artifact.etag):
+        return Response(status_code=304, headers=headers)
+    if request is not None and accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=artifact.gzip, media_type=artifact.media_type, headers=headers)
+    return Response(content=artifact.raw, media_type=artifact.media_type, headers=headers)
 
 class SimulationConfig(BaseModel):
     numDays: int
@@ -101,38 +171,67 @@ class SimulationConfig(BaseModel):
     agents: List[str]
     volatility: float
     newsEnabled: bool
-
-
-def run_full_simulation_task(cfg: SimulationConfig):
-    global SIMULATION_STATUS
-    
-    original_sigma_noise = config_module.SIGMA_NOISE 
+    asyncLearners: bool = False
+    newsProvider: str = "auto"  # "auto", "gemini" or "local"
+    newsSeed: Optional[int] = None
+
+
+def _evolved_genome(should_stop=None):
+    """Best GA genome for the current market setup, from the genome cache when possible."""
+    background = [
+        RandomAgent("BG_Rand"), MomentumAgent("BG_Mom"), ValueAgent("BG_Val"), ContrarianAgent("BG_Contra")
+    ]
+    hyperparams = evolution_hyperparams(**GA_SETTINGS)
+    key = evolution_key(SECTORS, background, hyperparams, seed=None, param_space=PARAM_SPACE)
+    cached = GENOME_CACHE.get(key)
+    if cached is not None:
+        print(f" Reusing cached GA genome {key[:12]} (fitness {cached['best_fitness']:.4f})")
+        return cached["best_genome"]
+
+    elites = GENOME_CACHE.warm_start_elites(SECTORS, limit=GA_SETTINGS["pop_size"])
+    if elites:
+        print(f" Warm-starting evolution from {len(elites)} cached elites")
+    result = evolve(**GA_SETTINGS, background_agents=background, sectors=SECTORS,
+                    workers=default_workers(), initial_population=elites, should_stop=should_stop)
+    GENOME_CACHE.put(key, result, sectors=SECTORS, meta=hyperparams)
+    return result["best_genome"]
+
+
+def run_full_simulation_task(config: dict, job):
+    """Run one simulation job in a pool worker, writing results to the job's directory."""
+    cfg = SimulationConfig(**config)
+    agents = []
+    stream = None
+    artifacts = {}
 
     try:
-        SIMULATION_STATUS = {"status": "GENERATING_NEWS", "day": 0, "total_days": cfg.numDays}
-        print(f" Simulation config received: {cfg.dict()}")
-        active_sigma_noise = original_sigma_noise * cfg.volatility
-        config_module.SIGMA_NOISE = active_sigma_noise
-        print(f" SIGMA_NOISE temporarily set to: {config_module.SIGMA_NOISE:.6f}")
+        job.update(status="GENERATING_NEWS", day=0, total_days=cfg.numDays, started=time.time())
+        print(f" Simulation config received ({job.job_id}): {cfg.dict()}")
+        base_config = MarketConfig.default()
+        market_config = base_config.replace(sigma_noise=base_config.sigma_noise * cfg.volatility)
+        print(f" SIGMA_NOISE for this run: {market_config.sigma_noise:.6f}")
         
         sim_sector_prices = cfg.initialPrices 
         herd_memory = {}
         if cfg.newsEnabled:
-            news_data = generate_market_news(cfg.numDays)
-            news_effects_df = simulate_from_news(os.path.join(OUTPUT_DIR, "news.json")) 
+            news_data = get_market_news(cfg.numDays, sim_sector_prices, provider=cfg.newsProvider,
+                                        seed=cfg.newsSeed, cache=NEWS_CACHE)
+            save_json(news_data, "news", job.output_dir, artifacts)
+            news_effects = simulate_from_news(sector_names=list(sim_sector_prices.keys()), news_data=news_data)
         else:
             print("News generation skipped (newsEnabled=False).")
-            news_data, news_effects_df = {}, pd.DataFrame()
-
-        SIMULATION_STATUS["status"] = "EVOLVING_AGENTS"
-        background = [
-            RandomAgent("BG_Rand"), MomentumAgent("BG_Mom"), ValueAgent("BG_Val"), ContrarianAgent("BG_Contra")
-        ]
-        result = evolve(pop_size=20, generations=8, eval_days=15, background_agents=background, sectors=SECTORS)
-        best_genome = result["best_genome"]
-        with open(os.path.join(OUTPUT_DIR, "best_ga_genome.json"), "w") as f:
-            json.dump(best_genome, f, indent=2)
-        SIMULATION_STATUS["status"] = "INITIALIZING_MARKET"
+            news_data, news_effects = {}, None
+
+        best_genome = None
+        if any(AGENT_MAP.get(name) is GeneticTrader for name in cfg.agents):
+            job.update(status="EVOLVING_AGENTS")
+            best_genome = _evolved_genome(should_stop=job.check_cancelled)
+            with open(job.path("best_ga_genome.json"), "w") as f:
+                json.dump(best_genome, f, indent=2)
+        else:
+            print("GA evolution skipped (no GeneticTrader requested).")
+        job.check_cancelled()
+        job.update(status="INITIALIZING_MARKET")
         
         agents = []
         
@@ -148,7 +247,7 @@ def run_full_simulation_task(cfg: SimulationConfig):
                     agents.append(AgentClass(unique_name, news_data))
                 elif agent_name in ["LongTermInvestorAgent", "LongTerm"]:
                     agents.append(AgentClass(unique_name, SECTORS)) 
-                elif agent_name in ["GeneticTrader", "GA"]:
+                elif AgentClass is GeneticTrader:
                     agents.append(AgentClass(unique_name, genome=best_genome, track_history=True))
                 else:
                     agents.append(AgentClass(unique_name))
@@ -156,7 +255,10 @@ def run_full_simulation_task(cfg: SimulationConfig):
                 print(f"Warning: Agent class not found for name: {agent_name}")
 
         for agent in agents:
+            agent.bind_config(market_config)
             agent.initialize_holdings(list(sim_sector_prices.keys())) 
+            if cfg.asyncLearners and hasattr(agent, "start_learner"):
+                agent.start_learner()
         agent_params_log = {}
 
         for agent in agents:
@@ -186,17 +288,20 @@ def run_full_simulation_task(cfg: SimulationConfig):
             
             agent_params_log[agent.name] = cleaned_params
         
-        with open(os.path.join(OUTPUT_DIR, "agent_params.json"), "w") as f:
-            json.dump(agent_params_log, f, indent=2)
-        engine = MarketEngine(agents, sim_sector_prices)
-        engine.news_effects = news_effects_df
+        save_json(agent_params_log, "agent_params", job.output_dir, artifacts)
+        engine = MarketEngine(agents, sim_sector_prices, market_config=market_config)
+        engine.news_effects = news_effects
         engine.herd_memory = herd_memory
+        stream = DayStreamWriter(job.path(DAY_STREAM_FILE))
+        stream.start(engine)
         
-        SIMULATION_STATUS["status"] = "SIMULATING"
+        job.update(status="SIMULATING")
         PPO_BATCH_SIZE = 5
         for day in range(1, cfg.numDays + 1):
-            SIMULATION_STATUS["day"] = day
+            job.check_cancelled()
+            job.update(day=day)
             engine.simulate_day(day)
+            stream.write_day(engine, day)
             if day % PPO_BATCH_SIZE == 0:
                 for agent in engine.agents:
                     if getattr(agent, "is_rl_agent", False) and hasattr(agent, "update"):
@@ -209,70 +314,274 @@ def run_full_simulation_task(cfg: SimulationConfig):
         for agent in engine.agents:
             if getattr(agent, "is_rl_agent", False) and hasattr(agent, "update"):
                 agent.update()
+            if getattr(agent, "learner", None) is not None:
+                print(f" {agent.name} learner: {agent.learner.version} publishes, {agent.learner.dropped} dropped, {agent.learner.errors} errors")
+                agent.stop_learner()
 
-        SIMULATION_STATUS["status"] = "SAVING_RESULTS"
+        if engine.decision_errors:
+            print(f"⚠️ Agent decide errors (HOLD substituted): {dict(engine.decision_errors)}")
+
+        job.update(status="SAVING_RESULTS")
 
         df_prices = pd.DataFrame(engine.get_sector_data())
         df_prices["Day"] = range(len(df_prices))
-        save_dataframe_as_json(df_prices, "market_prices")
-        
-        plot_price_histories(df_prices) 
-
-        plot_agent_performance(agents) 
+        save_table(df_prices, "market_prices", job.output_dir, artifacts)
         
-        df_transactions = pd.DataFrame(engine.transaction_log)
-        save_dataframe_as_json(df_transactions, "transactions")
+        df_transactions = engine.transaction_log.to_pandas()
+        save_table(df_transactions, "transactions", job.output_dir, artifacts,
+                   arrow_table=engine.transaction_log.to_arrow() if arrow_available() else None)
+        if arrow_available():
+            engine.transaction_log.write_parquet(job.path("transactions.parquet"))
         
         df_snapshots = pd.DataFrame(engine.agent_snapshots)
-        save_dataframe_as_json(df_snapshots, "agent_snapshots")
+        save_table(df_snapshots, "agent_snapshots", job.output_dir, artifacts, categorical=("Agent",))
 
-        SIMULATION_STATUS = {"status": "COMPLETE", "day": cfg.numDays, "total_days": cfg.numDays}
-        print(" Simulation successfully completed and results saved.")
+        build_transaction_index(job.path("index/transactions"), engine.transaction_log)
+        build_snapshot_index(job.path("index/agent_snapshots"), engine.agent_snapshots,
+                             [s.name for s in engine.sectors])
+
+        job.update(status="COMPLETE", day=cfg.numDays, finished=time.time())
+        print(f" Simulation {job.job_id} successfully completed and results saved.")
+        # Handed back to the API process, which caches the encoded files without re-reading them.
+        return artifacts
+
+    except JobCancelled:
+        job.update(status="CANCELLED", finished=time.time())
+        print(f" Simulation {job.job_id} cancelled.")
 
     except Exception as e:
-        SIMULATION_STATUS = {"status": "FAILED", "error": str(e)}
-        print(f" Simulation FAILED: {e}")
+        job.update(status="FAILED", error=str(e), finished=time.time())
+        print(f" Simulation {job.job_id} FAILED: {e}")
 
     finally:
-        config_module.SIGMA_NOISE = original_sigma_noise
+        if stream is not None:
+            stream.close((job.read() or {}).get("status"))
+        for agent in agents:
+            if getattr(agent, "learner", None) is not None:
+                agent.stop_learner(wait=False)
+
+
+@app.on_event("startup")
+def _recover_jobs():
+    JOBS.recover()
+
+@app.on_event("shutdown")
+def _stop_jobs():
+    JOBS.shutdown()
 
+def _latest_status():
+    job_id = JOBS.latest()
+    return JOBS.status(job_id) if job_id is not None else IDLE_STATUS
 
 @app.get("/")
 def read_root():
-    return {"status": "API Running", "simulation_state": SIMULATION_STATUS}
+    return {"status": "API Running", "simulation_state": _latest_status(), "workers": SIM_WORKERS}
 
 @app.post("/run-simulation")
-async def run_simulation(cfg: SimulationConfig, background_tasks: BackgroundTasks):
-    if SIMULATION_STATUS["status"] not in ["IDLE", "COMPLETE", "FAILED"]:
-        return {"message": "Simulation is already running or busy.", "state": SIMULATION_STATUS}
-
-    background_tasks.add_task(run_full_simulation_task, cfg)
-    return {"message": "Simulation started with custom config!", "state": SIMULATION_STATUS}
+async def run_simulation(cfg: SimulationConfig):
+    job_id = JOBS.submit(run_full_simulation_task, cfg.dict(), total_days=cfg.numDays)
+    return {"message": "Simulation queued with custom config!", "job_id": job_id, "state": JOBS.status(job_id)}
 
 @app.get("/status")
 def get_status():
-    return SIMULATION_STATUS
+    return _latest_status()
+
+@app.get("/jobs")
+def list_jobs():
+    return JOBS.list()
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    state = JOBS.status(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return state
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    state = JOBS.cancel(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return state
+
+STREAM_POLL_SECONDS = 0.25
+
+async def _day_events(job_id: str, offset: int):
+    """SSE events for a job's day stream from byte `offset`, until the job ends."""
+    path = JOBS.context(job_id).path(DAY_STREAM_FILE)
+    finished = False
+    while True:
+        records, offset = read_records(path, offset)
+        for end, line in records:
+            yield f"id: {end}\ndata: {line}\n\n"
+            if line.startswith('{"type":"end"'):
+                return
+        if records:
+            continue
+        # A crashed or recovered job never writes an "end" record: once it is terminal,
+        # one more read picks up anything flushed before the status changed, then stop.
+        if finished:
+            return
+        finished = (JOBS.status(job_id) or {}).get("status") in TERMINAL_STATES
+        if not finished:
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+
+def _stream_response(job_id: str, request: Request):
+    if job_id is None or not JOBS.exists(job_id):
+        raise HTTPException(status_code=404, detail="No such job to stream.")
+    # EventSource resumes from the last id it saw, which is a byte offset into the stream file.
+    last_id = request.headers.get("last-event-id", "0")
+    offset = int(last_id) if last_id.isdigit() else 0
+    return StreamingResponse(_day_events(job_id, offset), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/jobs/{job_id}/stream")
+def stream_job(job_id: str, request: Request):
+    return _stream_response(job_id, request)
+
+@app.get("/stream")
+def stream_latest(request: Request):
+    return _stream_response(JOBS.latest(), request)
+
+QUERY_FILTERS = {
+    "transactions": {"sector": "Sector", "action": "Action"},
+    "agent_snapshots": {},
+}
+
+_INDEX_TABLES = OrderedDict()
+
+def _indexed_table(root: str):
+    """Loaded (memory-mapped) index for `root`; a missing index is not remembered, it may appear later."""
+    table = _INDEX_TABLES.get(root)
+    if table is None:
+        table = IndexedTable.load(root)
+        if table is None:
+            return None
+        _INDEX_TABLES[root] = table
+        if len(_INDEX_TABLES) > 32:
+            _INDEX_TABLES.popitem(last=False)
+    _INDEX_TABLES.move_to_end(root)
+    return table
+
+def _query(table: str, job_id: Optional[str], agent, sector, action, day_from, day_to, cursor, limit, fields):
+    if table not in QUERY_FILTERS:
+        raise HTTPException(status_code=404, detail=f"Unknown table {table}.")
+    run_id, output_dir = _resolve_run(job_id)
+    index = _indexed_table(os.path.join(output_dir, "index", table)) if run_id != "legacy" else None
+    if index is None:
+        raise HTTPException(status_code=404, detail=f"No query index for {table}. Run simulation first.")
+
+    where = {}
+    for param, value in (("sector", sector), ("action", action)):
+        if value is None:
+            continue
+        column = QUERY_FILTERS[table].get(param)
+        if column is None:
+            raise HTTPException(status_code=400, detail=f"{table} cannot be filtered by {param}.")
+        where[column] = value.upper() if param == "action" else value
+    try:
+        cursor_pos = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    try:
+        rows, next_cursor = index.query(agent=agent, day_from=day_from, day_to=day_to, where=where,
+                                        fields=[f for f in fields.split(",") if f] if fields else None,
+                                        cursor=cursor_pos, limit=limit)
+    except UnknownValue:
+        # A filter value that never occurs in this run matches nothing.
+        rows, next_cursor = [], None
+    except UnknownField as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "job_id": run_id,
+        "rows": rows,
+        "next_cursor": str(next_cursor) if next_cursor is not None else None,
+    }
+
+@app.get("/query/{table}")
+def query_latest(table: str, agent: Optional[str] = None, sector: Optional[str] = None, action: Optional[str] = None,
+                 day_from: Optional[int] = None, day_to: Optional[int] = None, cursor: Optional[str] = None,
+                 limit: int = 500, fields: Optional[str] = None):
+    return _query(table, None, agent, sector, action, day_from, day_to, cursor, limit, fields)
+
+@app.get("/jobs/{job_id}/query/{table}")
+def query_job(job_id: str, table: str, agent: Optional[str] = None, sector: Optional[str] = None,
+              action: Optional[str] = None, day_from: Optional[int] = None, day_to: Optional[int] = None,
+              cursor: Optional[str] = None, limit: int = 500, fields: Optional[str] = None):
+    return _query(table, job_id, agent, sector, action, day_from, day_to, cursor, limit, fields)
+
+# Plots are rendered on first request from the saved results, never by the simulation itself.
+def _render_sector_trends(run_id: str, output_dir: str, save_path: str) -> bool:
+    artifact = _load_artifact(run_id, output_dir, "market_prices.json")
+    if artifact is None:
+        return False
+    df_prices = pd.DataFrame(json.loads(artifact.raw))
+    series = {col: df_prices[col].to_numpy() for col in df_prices.columns if col != "Day"}
+    render_price_histories(df_prices["Day"].to_numpy(), series, save_path)
+    return True
+
+def _render_agent_performance(run_id: str, output_dir: str, save_path: str) -> bool:
+    index = _indexed_table(os.path.join(output_dir, "index", "agent_snapshots"))
+    if index is None:
+        return False
+    cols = index.columns
+    return render_agent_performance(cols["Day"], cols["Agent"], cols["TotalValue"],
+                                    index.categories["Agent"], save_path)
+
+PLOT_RENDERERS = {"sector_trends": _render_sector_trends, "agent_performance": _render_agent_performance}
+_PLOT_LOCKS = {}
+_PLOT_LOCKS_GUARD = threading.Lock()
+
+def _plot_response(name: str, job_id: Optional[str]):
+    render = PLOT_RENDERERS.get(name)
+    if render is None:
+        raise HTTPException(status_code=404, detail=f"Unknown plot {name}.")
+    run_id, output_dir = _resolve_run(job_id)
+    path = os.path.join(output_dir, f"{name}.png")
+    if not os.path.exists(path):
+        with _PLOT_LOCKS_GUARD:
+            lock = _PLOT_LOCKS.setdefault(path, threading.Lock())
+        with lock:
+            if not os.path.exists(path) and not render(run_id, output_dir, path):
+                raise HTTPException(status_code=404, detail=f"No results to plot {name}. Run simulation first.")
+    return FileResponse(path, media_type="image/png")
+
+@app.get("/plots/{name}")
+def get_plot(name: str):
+    return _plot_response(name, None)
+
+@app.get("/jobs/{job_id}/plots/{name}")
+def get_job_plot(job_id: str, name: str):
+    return _plot_response(name, job_id)
+
+RESULT_NAMES = ("market_prices", "agent_performance", "transactions", "agent_snapshots", "news", "agent_params")
+
+@app.get("/jobs/{job_id}/data/{name}")
+def get_job_data(job_id: str, name: str, request: Request):
+    if name not in RESULT_NAMES:
+        raise HTTPException(status_code=404, detail=f"Unknown result {name}.")
+    return _read_json_data(name, request, job_id)
 
 @app.get("/data/market_prices")
-def get_market_prices():
-    return _read_json_data("market_prices")
+def get_market_prices(request: Request):
+    return _read_json_data("market_prices", request)
 
 @app.get("/data/agent_performance")
-def get_agent_performance():
-    return _read_json_data("agent_performance")
+def get_agent_performance(request: Request):
+    return _read_json_data("agent_performance", request)
 
 @app.get("/data/transactions")
-def get_transactions():
-    return _read_json_data("transactions")
+def get_transactions(request: Request):
+    return _read_json_data("transactions", request)
 
 @app.get("/data/agent_snapshots")
-def get_agent_snapshots():
-    return _read_json_data("agent_snapshots")
+def get_agent_snapshots(request: Request):
+    return _read_json_data("agent_snapshots", request)
 
 @app.get("/data/news")
-def get_news_feed():
-    return _read_json_data("news")
+def get_news_feed(request: Request):
+    return _read_json_data("news", request)
 
 @app.get("/data/agent_params")
-def get_agent_params():
-    return _read_json_data("agent_params")
\ No newline at end of file
+def get_agent_params(request: Request):
+    return _read_json_data("agent_params", request)
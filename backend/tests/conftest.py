@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# Backend modules import each other as top-level packages (core.*, agents.*), as server.py does.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+# tests/test_lstm_features.py
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+
+from agents.lstm_trader_agent import StreamingFeatures, compute_features
+
+
+def _random_walk(rng, n):
+    """Geometric random walk with flat stretches (zero gains and losses exercise the RSI branch)."""
+    prices = [100.0]
+    while len(prices) < n:
+        if rng.random() < 0.1:
+            prices.extend([prices[-1]] * int(rng.integers(1, 12)))
+        else:
+            prices.append(prices[-1] * float(np.exp(rng.normal(0, 0.02))))
+    return prices[:n]
+
+
+@pytest.mark.parametrize("window_size", [1, 5, 10, 30])
+def test_streaming_window_matches_compute_features(window_size):
+    rng = np.random.default_rng(window_size)
+    for _ in range(10):
+        prices = _random_walk(rng, 600)
+        stream = StreamingFeatures(window_size)
+        lengths = list(range(0, 12)) + sorted(rng.integers(12, 601, size=25).tolist()) + [600]
+        for n in lengths:
+            window = stream.sync(prices[:n]).window()
+            expected = compute_features(prices[:n])[-window_size:]
+            assert window.shape == expected.shape, n
+            assert np.array_equal(window, expected), n
+
+
+def test_sync_replays_rewritten_history():
+    rng = np.random.default_rng(0)
+    prices = _random_walk(rng, 50)
+    stream = StreamingFeatures(10).sync(prices)
+    rewritten = prices[:30] + _random_walk(rng, 10)
+    assert np.array_equal(stream.sync(rewritten).window(), compute_features(rewritten)[-10:])
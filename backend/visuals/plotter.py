@@ -1,50 +1,76 @@
-import matplotlib.pyplot as plt
-import pandas as pd
+import numpy as np
 import os
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# Figure/FigureCanvasAgg instead of pyplot: no global figure state, so plots
+# can be rendered lazily from request threads while simulations run elsewhere.
+
+
+def _save(fig, save_path, **kwargs):
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+    FigureCanvasAgg(fig)
+    # Write next to the target and rename, so a concurrent reader never sees half a PNG.
+    tmp = f"{save_path}.tmp.png"
+    fig.savefig(tmp, **kwargs)
+    os.replace(tmp, save_path)
 
-def plot_price_histories(df_prices, save_path="output/sector_trends.png"):
-    
-    plt.figure(figsize=(10, 6))
-    for col in df_prices.columns:
-        if col != "Day":
-            plt.plot(df_prices["Day"], df_prices[col], label=col)
-    plt.xlabel("Day")
-    plt.ylabel("Stock Price")
-    plt.title("Sector Price Trends Over Time")
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    plt.savefig(save_path, bbox_inches="tight")
-    plt.close()
-    print(f"Sector trends saved → {save_path}")
 
+def render_price_histories(days, series: dict, save_path):
+    """Sector price lines; `series` maps sector name -> prices aligned with `days`."""
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    for name, prices in series.items():
+        ax.plot(days, prices, label=name)
+    ax.set_xlabel("Day")
+    ax.set_ylabel("Stock Price")
+    ax.set_title("Sector Price Trends Over Time")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    _save(fig, save_path, bbox_inches="tight")
+    print(f"Sector trends saved → {save_path}")
 
-def plot_agent_performance(agents):
-    data = []
-    for agent in agents:
-        if hasattr(agent, "wealth_history"):
-            for day, wealth in enumerate(agent.wealth_history, start=1):
-                data.append({"Agent": agent.name, "Day": day, "Wealth": wealth})
 
-    if not data:
+def render_agent_performance(days, agent_codes, wealth, agent_names, save_path):
+    """
+    Wealth line per agent from long-form columns (one row per agent and day).
+    Rows are grouped with one stable sort instead of a filter per agent.
+    """
+    agent_codes = np.asarray(agent_codes)
+    if len(agent_codes) == 0:
         print(" No agent performance data to plot.")
-        return
+        return False
+    days, wealth = np.asarray(days), np.asarray(wealth)
+    order = np.argsort(agent_codes, kind="stable")
+    bounds = np.searchsorted(agent_codes[order], np.arange(len(agent_names) + 1))
 
-    df_agents = pd.DataFrame(data)
+    fig = Figure(figsize=(8, 5))
+    ax = fig.add_subplot()
+    for code, name in enumerate(agent_names):
+        rows = order[bounds[code]:bounds[code + 1]]
+        if len(rows):
+            ax.plot(days[rows], wealth[rows], label=name)
+    ax.set_title("Agent Wealth Over Time")
+    ax.set_xlabel("Day")
+    ax.set_ylabel("Wealth (₹)")
+    ax.legend()
+    fig.tight_layout()
+    _save(fig, save_path)
+    print(f"Agent performance saved → {save_path}")
+    return True
 
-    plt.figure(figsize=(8, 5))
-    for agent_name in df_agents["Agent"].unique():
-        df_subset = df_agents[df_agents["Agent"] == agent_name]
-        plt.plot(df_subset["Day"], df_subset["Wealth"], label=agent_name)
 
-    plt.title("Agent Wealth Over Time")
-    plt.xlabel("Day")
-    plt.ylabel("Wealth (₹)")
-    plt.legend()
-    plt.tight_layout()
+def plot_price_histories(df_prices, save_path="output/sector_trends.png"):
+    series = {col: df_prices[col] for col in df_prices.columns if col != "Day"}
+    render_price_histories(df_prices["Day"], series, save_path)
 
-    os.makedirs("output", exist_ok=True)
-    plt.savefig("output/agent_performance.png")
-    plt.close()
 
-    print("Agent performance saved → output/agent_performance.png")
\ No newline at end of file
+def plot_agent_performance(agents, save_path="output/agent_performance.png"):
+    tracked = [a for a in agents if hasattr(a, "wealth_history") and a.wealth_history]
+    if not tracked:
+        print(" No agent performance data to plot.")
+        return
+    days = np.concatenate([np.arange(1, len(a.wealth_history) + 1) for a in tracked])
+    codes = np.concatenate([np.full(len(a.wealth_history), i) for i, a in enumerate(tracked)])
+    wealth = np.concatenate([np.asarray(a.wealth_history, dtype=np.float64) for a in tracked])
+    render_agent_performance(days, codes, wealth, [a.name for a in tracked], save_path)
@@ -69,6 +69,8 @@ export default function GeneratePanel() {
                     newStatus = 'COMPLETE';
                 } else if (backendStatus === "FAILED") {
                     newStatus = 'FAILED';
+                } else if (backendStatus === "CANCELLED") {
+                    newStatus = 'CANCELLED';
                 } else if (backendStatus === "IDLE") {
                     newStatus = 'IDLE'; 
                 }
@@ -85,6 +87,8 @@ export default function GeneratePanel() {
                         const failMessage = backendError || `Simulation job failed on the server.`;
                         setError(failMessage);
                         setSummary(null);
+                    } else if (newStatus === 'CANCELLED') {
+                        setSummary(null);
                     } else {
                         const currentDay = Math.min(day, total_days);
                         setSummary({
@@ -168,6 +172,12 @@ export default function GeneratePanel() {
                     </div>
                 )}
 
+                {displayStatus === 'CANCELLED' && (
+                    <div className="text-sm text-gray-600 bg-gray-100 dark:bg-gray-800/50 p-2 rounded-md">
+                        Simulation was cancelled.
+                    </div>
+                )}
+
                 {error && displayStatus === 'FAILED' && (
                     <div className="text-sm text-red-600 bg-red-50 dark:bg-red-900/30 p-2 rounded-md mt-1">
                         **ERROR**: {error}
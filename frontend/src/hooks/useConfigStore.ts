@@ -2,7 +2,7 @@
 
 import { create } from 'zustand';
 
-export type SimulationStatusType = 'IDLE' | 'RUNNING' | 'COMPLETE' | 'FAILED';
+export type SimulationStatusType = 'IDLE' | 'RUNNING' | 'COMPLETE' | 'FAILED' | 'CANCELLED';
 
 export type ConfigState = {
     numDays: number;